@@ -87,12 +87,13 @@ class JpTableDemo(App):
         try:
             target=msg["target"]
             target.disabled=True
-            for rowKey in self.table2.rowsByKey.keys():
+            cells=[]
+            for rowKey in self.table2.recordsByKey.keys():
                 wikidataLink=self.table2.getCellValue(rowKey,"president")
                 itemId=wikidataLink.replace("http://www.wikidata.org/entity/","")
                 link=Link.create(url=wikidataLink,text=itemId)
-                self.table2.updateCell(rowKey, "president",link)
-            pass
+                cells.append((rowKey,"president",link))
+            await self.table2.updateCells(cells)
         except Exception as ex:
             self.handleException(ex)
         pass
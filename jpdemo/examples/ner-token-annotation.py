@@ -29,8 +29,11 @@ def parse(self, msg):
     rawStr = msg.value[lastPos:-1]
     if rawStr:
         tokens.append(rawStr)
-    self.output.delete_components()
-    tokenSeq = TokenSequence(tokens, a=self.output)
+    if self.tokenSeq is None:
+        self.tokenSeq = TokenSequence(tokens, a=self.output)
+    else:
+        # only the changed tokens are rebuilt
+        self.tokenSeq.update(tokens)
 
 
 def ner_demo():
@@ -43,6 +46,7 @@ def ner_demo():
     referenceInput.on("change", parse)
     referenceInput.nlp = nlp
     referenceInput.output = jp.QDiv(a=wp)
+    referenceInput.tokenSeq = None
     return wp
 
 if not _has_spacy:
@@ -22,6 +22,7 @@ import traceback
 from argparse import ArgumentParser
 from argparse import RawDescriptionHelpFormatter
 from justpy.htmlcomponents import JustpyBaseComponent
+from jpwidgets.widgets import LazyContent
 from dataclasses import dataclass
 
 class App(object):
@@ -634,7 +635,7 @@ class Alert(jp.Div):
         """
         self.a.remove_component(self)
         
-class Collapsible(jp.Div):
+class Collapsible(jp.Div, LazyContent):
     """
     Collapsible div
     see https://getbootstrap.com/docs/5.0/components/accordion/
@@ -642,9 +643,15 @@ class Collapsible(jp.Div):
     use the body attribute to assign contents to the collapsible body
     """
 
-    def __init__(self, label:str, collapsed:bool=False, **kwargs):
+    def __init__(self, label:str, collapsed:bool=False, contentFactory:Callable=None, discardOnHide:bool=False, **kwargs):
         '''
         constructor
+
+        Args:
+            label(str): the label of the collapse button
+            collapsed(bool): the initial collapse state
+            contentFactory(Callable): function(a) - sync or async - that adds the content to the given body - only called when the body is shown the first time - await load() if an async content is shown initially
+            discardOnHide(bool): if True delete the body content created by the contentFactory on collapse - it is created again on the next show
         '''
         super().__init__(classes="accordion", **kwargs)
         self.div = jp.Div(a=self, classes="accordion-item")
@@ -654,15 +661,25 @@ class Collapsible(jp.Div):
         self.btn = jp.Button(a=self.div,
                              inner_html=self.label,
                              classes=self.btnClasses,
-                             click=self.collapse)
+                             click=self.onCollapseClick)
         self.collapsibleDiv = jp.Div(a=self.div, classes=f"{self.bodyClasses} collapse show")
         self.body = jp.Div(a=self.collapsibleDiv, classes=f"accordion-body collapse show")
+        self.setupLazyContent(self.body, contentFactory, discardOnHide)
         self.collapsed=collapsed
-        self.collapse(changeState=True)
+        self.pendingContent = self.collapse(changeState=True)
+
+    def isShown(self) -> bool:
+        """
+        check whether the body is currently shown
+        """
+        return "show" in self.collapsibleDiv.classes.split()
 
     def collapse(self, changeState:bool=True):
         """
         change state of Collapsible body
+
+        Returns:
+            the awaitable of an async contentFactory or None
         """
         if self.collapsed:
             self.btn.classes = f"{self.btnClasses}"
@@ -672,13 +689,25 @@ class Collapsible(jp.Div):
             self.collapsibleDiv.classes = f"{self.bodyClasses} collapse"
         if changeState:
             self.collapsed = not self.collapsed
+        return self.updateLazyContent(self.isShown())
+
+    async def onCollapseClick(self, _msg):
+        """
+        handle a click on the collapse button
+        """
+        await self.load()
+        pending = self.collapse(changeState=True)
+        if pending is not None:
+            await pending
 
     def setCollapseState(self, collapsed:bool):
         """
         set the collapse state to the given state
         """
         self.collapsed = collapsed
-        self.collapse(changeState=False)
+        pending = self.collapse(changeState=False)
+        if pending is not None:
+            self.pendingContent = pending
 
 
 class DebugOutput(jp.Div):
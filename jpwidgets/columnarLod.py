@@ -0,0 +1,310 @@
+'''
+Created on 2026-10-18
+
+@author: wf
+'''
+from collections.abc import MutableMapping, Sequence
+from typing import Dict, List
+import weakref
+
+try:
+    import numpy as np
+    _has_numpy = True
+except ImportError:
+    _has_numpy = False
+
+class ColumnarLod(Sequence):
+    '''
+    a read/write list of dicts view on column oriented data
+    e.g. a dict of numpy arrays or a pandas DataFrame
+
+    the records are lightweight views that read and write the
+    cell values by (row index, column) on demand
+    '''
+
+    def __init__(self, columns:Dict[str,Sequence], copyOnWrite:bool=False):
+        '''
+        constructor
+
+        Args:
+            columns(Dict[str,Sequence]): the column values by column name - all columns need to have the same length
+            copyOnWrite(bool): if True a column is copied before its first edit so that the given column values stay unchanged
+        '''
+        self.columns = columns
+        self.copyOnWrite = copyOnWrite
+        # the columns that have been copied on write
+        self.copiedColumns = set()
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise Exception(f"columns need to have the same length but have {sorted(lengths)}")
+        self.length = lengths.pop() if lengths else 0
+        # the record views by index - a record has a stable identity as long as it is in use
+        # e.g. by a row of a table but is not kept beyond that
+        self.records = weakref.WeakValueDictionary()
+
+    @classmethod
+    def fromDataFrame(cls, df) -> 'ColumnarLod':
+        '''
+        create a columnar list of dicts for the given pandas DataFrame
+
+        Args:
+            df(DataFrame): the data frame to use - the values of each column are accessed via to_numpy
+            and a column is copied on its first edit so that the data frame stays unchanged
+
+        Returns:
+            ColumnarLod: the list of dicts view
+        '''
+        columns = {column: df[column].to_numpy() for column in df.columns}
+        return cls(columns, copyOnWrite=True)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError(f"record index {index} out of range")
+        record = self.records.get(index)
+        if record is None:
+            record = ColumnarRecord(self, index)
+            self.records[index] = record
+        return record
+
+    def take(self, order:Sequence) -> 'ColumnarView':
+        '''
+        get a view on the records in the given row order
+
+        Args:
+            order(Sequence): the row indexes e.g. as returned by argsort
+
+        Returns:
+            ColumnarView: the read-only view - records are only created when accessed
+        '''
+        return ColumnarView(self, order)
+
+    def getFilterMask(self, filters:Dict[str,str]):
+        '''
+        get a vectorized mask of the rows whose text contains the given lower case filter text
+        in each of the given columns - None values have the empty text
+
+        Args:
+            filters(Dict[str,str]): the lower case filter text by column
+
+        Returns:
+            np.ndarray: the boolean mask or None if a column can not be filtered vectorized
+        '''
+        if not _has_numpy:
+            return None
+        mask = np.ones(self.length, dtype=bool)
+        for column, filterText in filters.items():
+            if column not in self.columns:
+                # the missing values have the empty text
+                mask[:] = filterText == ""
+                continue
+            values = np.asarray(self.columns[column])
+            # the text of the numpy values needs to be the same as the one of the python values
+            if not (values.dtype.kind in "biuUO" or values.dtype == np.float64):
+                return None
+            texts = values.astype(str)
+            if values.dtype.kind == "O":
+                texts[np.equal(values, None)] = ""
+            mask &= np.char.find(np.char.lower(texts), filterText) >= 0
+        return mask
+
+    def filter(self, filters:Dict[str,str]) -> 'ColumnarView':
+        '''
+        get a view on the records matching the given filters
+
+        Args:
+            filters(Dict[str,str]): the lower case filter text by column
+
+        Returns:
+            ColumnarView: the matching records or None if the filters can not be applied vectorized
+        '''
+        mask = self.getFilterMask(filters)
+        if mask is None:
+            return None
+        return self.take(np.flatnonzero(mask).tolist())
+
+    def getKeyMap(self, column:str) -> 'ColumnarKeyMap':
+        '''
+        get the records by the values of the given key column
+
+        Args:
+            column(str): the key column e.g. the primary key of a table
+
+        Returns:
+            ColumnarKeyMap: the mapping of key values to records
+        '''
+        if column not in self.columns:
+            raise KeyError(f"{column} is not a column of the columnar list of dicts")
+        return ColumnarKeyMap(self, column)
+
+    def keys(self) -> List[str]:
+        '''
+        get the column names
+        '''
+        return list(self.columns.keys())
+
+    def getValue(self, index:int, column:str):
+        '''
+        get the value at the given row index and column
+
+        Args:
+            index(int): the row index
+            column(str): the column name
+
+        Returns:
+            object: the value as a plain python object
+        '''
+        value = self.columns[column][index]
+        if _has_numpy and isinstance(value, np.generic):
+            value = value.item()
+        return value
+
+    def setValue(self, index:int, column:str, value):
+        '''
+        set the value at the given row index and column
+
+        Args:
+            index(int): the row index
+            column(str): the column name
+            value(object): the value to set
+        '''
+        values = self.columns[column]
+        readOnly = _has_numpy and isinstance(values, np.ndarray) and not values.flags.writeable
+        if readOnly or (self.copyOnWrite and column not in self.copiedColumns):
+            # e.g. the array of a DataFrame column - copy on first write
+            values = values.copy() if hasattr(values, "copy") else list(values)
+            self.columns[column] = values
+            self.copiedColumns.add(column)
+        values[index] = value
+
+    def argsort(self, column:str) -> List[int]:
+        '''
+        get the row indexes in the sort order of the given column using a vectorized sort
+
+        Args:
+            column(str): the column to sort by
+
+        Returns:
+            List[int]: the row indexes or None if the column can not be sorted vectorized
+        '''
+        values = self.columns[column]
+        if _has_numpy and isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+            return np.argsort(values, kind="stable").tolist()
+        return None
+
+class ColumnarView(Sequence):
+    '''
+    a read-only view on the records of a ColumnarLod in a given row order
+    '''
+
+    def __init__(self, lod:ColumnarLod, order:Sequence):
+        self.lod = lod
+        self.order = order
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.lod[i] for i in self.order[index]]
+        return self.lod[self.order[index]]
+
+    def reversed(self) -> 'ColumnarView':
+        '''
+        get a view on the records in the reverse order
+        '''
+        return ColumnarView(self.lod, self.order[::-1])
+
+    def filter(self, filters:Dict[str,str]) -> 'ColumnarView':
+        '''
+        get a view on the records matching the given filters keeping my order
+
+        Args:
+            filters(Dict[str,str]): the lower case filter text by column
+
+        Returns:
+            ColumnarView: the matching records or None if the filters can not be applied vectorized
+        '''
+        mask = self.lod.getFilterMask(filters)
+        if mask is None:
+            return None
+        order = np.asarray(self.order, dtype=np.intp)
+        return ColumnarView(self.lod, order[mask[order]].tolist())
+
+class ColumnarKeyMap(MutableMapping):
+    '''
+    the records of a ColumnarLod by the values of a key column
+
+    the row index of each key is looked up in a value to index map that is
+    built from the column array on first use - the records are only created
+    when they are accessed
+    '''
+
+    def __init__(self, lod:ColumnarLod, column:str):
+        self.lod = lod
+        self.column = column
+        self._indexes = None
+
+    @property
+    def indexes(self) -> dict:
+        if self._indexes is None:
+            values = self.lod.columns[self.column]
+            values = values.tolist() if hasattr(values, "tolist") else list(values)
+            self._indexes = dict(zip(values, range(len(values))))
+        return self._indexes
+
+    def __getitem__(self, key):
+        return self.lod[self.indexes[key]]
+
+    def __setitem__(self, key, record:'ColumnarRecord'):
+        self.indexes[key] = record.index
+
+    def __delitem__(self, key):
+        del self.indexes[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self.indexes
+
+    def __iter__(self):
+        return iter(self.indexes)
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+class ColumnarRecord(MutableMapping):
+    '''
+    a record view on a row of a ColumnarLod
+    '''
+    __slots__ = ("lod", "index", "__weakref__")
+
+    def __init__(self, lod:ColumnarLod, index:int):
+        self.lod = lod
+        self.index = index
+
+    def __getitem__(self, column:str):
+        if column not in self.lod.columns:
+            raise KeyError(column)
+        return self.lod.getValue(self.index, column)
+
+    def __setitem__(self, column:str, value):
+        if column not in self.lod.columns:
+            raise KeyError(f"{column} is not a column of the columnar list of dicts")
+        self.lod.setValue(self.index, column, value)
+
+    def __delitem__(self, column:str):
+        raise TypeError("columns of a columnar record can not be deleted")
+
+    def __iter__(self):
+        return iter(self.lod.columns)
+
+    def __len__(self) -> int:
+        return len(self.lod.columns)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)})"
@@ -1,6 +1,16 @@
-from datetime import datetime
-from typing import List
+import asyncio
+import bisect
+from collections import OrderedDict, deque
+from collections.abc import MutableSequence
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime
+import html
+import io
+import json
+from typing import AsyncIterable, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 import justpy as jp
+from starlette.responses import StreamingResponse
 
 class Table(jp.Div):
     '''
@@ -12,45 +22,907 @@ class Table(jp.Div):
     tr_odd_classes = ''
     th_classes = 'text-center'
     thead_classes=''
+    # number of rows to move the window per wheel event in virtual mode
+    scroll_rows = 3
+    # minimum milliseconds between two wheel events sent by the browser
+    scroll_throttle = 100
+    # maximum number of changed cells and rows that are pushed individually - larger
+    # batches are pushed with a single update of the table body
+    push_batch_limit = 10
+    page_nav_classes = ''
+    page_button_classes = ''
+    page_label_classes = ''
+    filter_input_classes = 'form-input'
+    sort_ascending_icon = "▲"
+    sort_descending_icon = "▼"
 
-    def __init__(self, lod:List[dict],headerMap=None,primaryKey:str=None,allowInput:bool=True,debugContainer=None,**kwargs):
+    def __init__(self, lod:List[dict],headerMap=None,primaryKey:str=None,allowInput:bool=True,debugContainer=None,windowSize:int=None,overscan:int=5,pageSize:int=None,pageCacheSize:int=5,renderAsHtml:bool=False,htmlColumns:List[str]=None,sortable:bool=False,filterable:bool=False,lazyInput:bool=False,changeSink:'ChangeSinkInterface'=None,flushSize:int=100,flushInterval:float=1.0,journalSize:int=1000,schema:dict=None,schemaSampleSize:int=100,trackChanges:bool=True,**kwargs):
         '''
         constructor
         
         Args:
-            lod(List[dict]): the table content
+            lod(List[dict]): the table content - any sequence of dicts e.g. a ColumnarLod view on column arrays - rows can only be appended, inserted, removed or moved if it is a mutable sequence like a list
             headerMap(dict): a mapping for headers (if any)
             allowInput(bool): allow editing/input
             primaryKey(str): the column holding the primary key
+            windowSize(int): if set only this number of rows is materialized as components (virtual scrolling)
+            overscan(int): number of extra rows to materialize before and after the visible window
+            pageSize(int): if set show the rows page by page with navigation controls
+            pageCacheSize(int): number of recently viewed pages whose rows are kept for reuse
+            renderAsHtml(bool): render the rows of a read-only table as a single html string instead of TableRow components
+            htmlColumns(List[str]): columns holding html that is not to be escaped when rendering as html
+            sortable(bool): allow sorting by clicking on the column headers
+            filterable(bool): show a filter input for each column
+            lazyInput(bool): keep only compact cells and create the input control of a cell when it is clicked (click-to-edit)
+            changeSink(ChangeSinkInterface): the sink to write back the edited cells to in batches
+            flushSize(int): number of pending changes that triggers a write back
+            flushInterval(float): maximum number of seconds a change is pending before it is written back
+            journalSize(int): number of most recent changes kept in the journal
+            schema(dict): the ColumnType or python type by column - the types of the other columns are inferred
+            schemaSampleSize(int): number of records to infer the column types from
+            trackChanges(bool): track the changed cells for getDelta and pushChanges - switch off if the table is only updated by full page updates
         '''
+        if windowSize is not None and pageSize is not None:
+            raise Exception("windowSize and pageSize may not be used together")
+        if renderAsHtml and allowInput:
+            raise Exception("renderAsHtml is only possible for read-only tables with allowInput=False")
         self.lod = lod
+        # the records in display order after sorting and filtering
+        self.viewRecords = lod
         self.primaryKey=primaryKey
         self.rowsByKey={}
+        self.recordsByKey={}
+        # the materialized TableRows by id of their record
+        self.rowsByRecordId={}
         self.rows=[]
         self.allowInput=allowInput
+        self.lazyInput=lazyInput and allowInput
+        # the TableRow and column of the cell currently in edit mode when using lazyInput
+        self.editCell=None
+        self.windowSize=windowSize
+        self.overscan=overscan
+        self.windowStart=0
+        self.pageSize=pageSize
+        self.pageCacheSize=max(1,pageCacheSize)
+        self.pageCache=OrderedDict()
+        self.pageIndex=0
+        # cells changed since the last push to the browser
+        self.trackChanges=trackChanges
+        self.dirtyCells={}
+        # rows with changed compact cells by row id when using lazyInput
+        self.dirtyRows={}
+        self.renderAsHtml=renderAsHtml
+        self.htmlColumns=set(htmlColumns) if htmlColumns is not None else set()
+        # html of the rendered rows by record id in display order
+        self.rowHtmlCache={}
+        # the records of the rendered rows - keeps the ids of rowHtmlCache valid
+        self.htmlRecords=[]
+        # records whose html needs to be regenerated
+        self.staleRecords={}
+        # (record,column) changes since the last push when rendering as html
+        self.dirtyRecordCells={}
+        self.sortable=sortable
+        self.filterable=filterable
+        # sort order indexes by column
+        self.columnIndexes={}
+        # lookup indexes by name
+        self.keyIndexes={}
+        self.sortColumn=None
+        self.sortDescending=False
+        self.filters={}
+        self.headerCells={}
+        self.headerMap=headerMap
+        self.tbody=None
+        self.declaredSchema=schema if schema is not None else {}
+        self.schemaSampleSize=schemaSampleSize
+        # the ColumnType by column
+        self.schema={}
         super().__init__(**kwargs)
         self.table = jp.Table(a=self)
         self.table.set_class(self.t_classes)
         #First row of values is header
         if self.lod and len(self.lod)>0:
-            if headerMap is None:
-                headerMap={}
-                headerColumns = self.lod[0].keys()
-                for headerColumn in headerColumns:
-                    headerMap[headerColumn]=headerColumn
-            thead = jp.Thead(a=self.table, classes=self.thead_classes)
-            tr = jp.Tr(a=thead)
-            for _column,header in headerMap.items():
-                th=jp.Th(text="", classes=self.th_classes, a=tr)  
-                th.inner_html=header  
-            tbody = jp.Tbody(a=self.table)
-            for _i, row in enumerate(self.lod):
-                tableRow=TableRow(table=self,a=tbody, record=row, headerMap=headerMap)
+            self.setupHeader(self.lod[0])
+            if self.primaryKey is not None:
+                if hasattr(self.lod,"getKeyMap"):
+                    # look up the records via the key column without creating them up front
+                    self.recordsByKey=self.lod.getKeyMap(self.primaryKey)
+                else:
+                    for record in self.lod:
+                        self.recordsByKey[record[self.primaryKey]]=record
+            self.renderRows()
+        if self.isPaged():
+            self.addPageNavigation()
+        if self.isVirtual():
+            self.add_event("wheel")
+            self.additional_properties=["deltaY"]
+            self.on("wheel",self.onWheel,throttle=self.scroll_throttle)
+        self.debugContainer=debugContainer
+        # the most recent edits
+        self.journal=deque(maxlen=journalSize)
+        # the edits not written back to the change sink yet
+        self.pendingChanges=[]
+        self.changeSink=changeSink
+        self.flushSize=flushSize
+        self.flushInterval=flushInterval
+        self.flushTask=None
+        self.flushEvent=None
+        self.flushLock=None
+        self.flushLockLoop=None
+        
+    def setupHeader(self,record:dict):
+        '''
+        set up the header and the table body 
+        
+        Args:
+            record(dict): the first record - its keys are the columns if no headerMap has been given
+        '''
+        if self.headerMap is None:
+            self.headerMap={}
+            for headerColumn in record.keys():
+                self.headerMap[headerColumn]=headerColumn
+        headerMap=self.headerMap
+        self.setupSchema(record)
+        thead = jp.Thead(a=self.table, classes=self.thead_classes)
+        tr = jp.Tr(a=thead)
+        for column,header in headerMap.items():
+            th=jp.Th(text="", classes=self.th_classes, a=tr)  
+            th.inner_html=header  
+            th.column=column
+            self.headerCells[column]=th
+            if self.sortable:
+                th.on("click",self.onHeaderClick)
+        if self.filterable:
+            filterRow = jp.Tr(a=thead)
+            for column in headerMap.keys():
+                th=jp.Th(a=filterRow, classes=self.th_classes)
+                filterInput=jp.InputChangeOnly(a=th, placeholder="filter", classes=self.filter_input_classes)
+                filterInput.column=column
+                filterInput.on("change",self.onFilterChange)
+        self.tbody = jp.Tbody(a=self.table, temp=False)
+        
+    def setupSchema(self,record:dict):
+        '''
+        set up the column types from the declared schema and infer the 
+        types of the other columns from a sample of the records
+        
+        Args:
+            record(dict): the first record - used if lod is still empty
+        '''
+        sample=list(self.lod[:self.schemaSampleSize]) if len(self.lod)>0 else [record]
+        for column in self.headerMap.keys():
+            columnType=self.declaredSchema.get(column)
+            if columnType is None:
+                columnType=ColumnType.infer([sampleRecord.get(column) for sampleRecord in sample])
+            elif not isinstance(columnType,ColumnType):
+                columnType=ColumnType.forType(columnType)
+            self.schema[column]=columnType
+            
+    def getColumnType(self,column:str)->'ColumnType':
+        '''
+        get the type of the given column
+        '''
+        return self.schema.get(column,ColumnType.TEXT)
+        
+    def isVirtual(self)->bool:
+        '''
+        check whether only a window of the rows is materialized
+        '''
+        return self.windowSize is not None
+    
+    def isPaged(self)->bool:
+        '''
+        check whether the rows are shown page by page
+        '''
+        return self.pageSize is not None
+        
+    def getWindow(self)->Tuple[int,int]:
+        '''
+        get the range of record indices to be materialized as TableRow components
+        
+        Returns:
+            Tuple[int,int]: the start (inclusive) and end (exclusive) index
+        '''
+        total=len(self.viewRecords)
+        if self.isPaged():
+            start=self.pageIndex*self.pageSize
+            return start,min(total,start+self.pageSize)
+        if not self.isVirtual():
+            return 0,total
+        start=max(0,self.windowStart-self.overscan)
+        end=min(total,self.windowStart+self.windowSize+self.overscan)
+        return start,end
+    
+    def renderRows(self,reusableRows:dict=None):
+        '''
+        (re)render the rows of the current window reusing the
+        TableRow components of records that are still in the window
+        
+        Args:
+            reusableRows(dict): additional TableRows that may be reused by record id
+        '''
+        if self.renderAsHtml:
+            self.renderHtmlRows()
+            return
+        if self.isPaged():
+            rows=self.getPageRows(self.pageIndex,reusableRows)
+        else:
+            previousRows={id(tableRow.record):tableRow for tableRow in self.rows}
+            if reusableRows:
+                previousRows.update(reusableRows)
+                reusableRows.clear()
+            rows=[]
+            start,end=self.getWindow()
+            for record in self.viewRecords[start:end]:
+                tableRow=previousRows.pop(id(record),None)
+                if tableRow is None:
+                    tableRow=TableRow(table=self, record=record, headerMap=self.headerMap)
+                rows.append(tableRow)
+            # free the event handlers of the rows that left the window
+            for tableRow in previousRows.values():
+                tableRow.delete()
+        self.rows=rows
+        self.tbody.components=list(rows)
+        self.indexRows()
+        
+    def renderHtmlRows(self):
+        '''
+        render the rows of the current window as a single html string
+        reusing the html of the records that are still in the window
+        '''
+        rowHtmlCache={}
+        start,end=self.getWindow()
+        records=self.viewRecords[start:end]
+        for record in records:
+            rowHtml=self.rowHtmlCache.get(id(record))
+            if rowHtml is None or id(record) in self.staleRecords:
+                rowHtml=self.getRowHtml(record)
+            rowHtmlCache[id(record)]=rowHtml
+        self.rowHtmlCache=rowHtmlCache
+        self.htmlRecords=records
+        self.staleRecords={}
+        self.tbody.inner_html="".join(rowHtmlCache.values())
+        
+    def getRowHtml(self,record:dict)->str:
+        '''
+        get the html for the given record
+        
+        Args:
+            record(dict): the record to render
+            
+        Returns:
+            str: the html of the table row
+        '''
+        classAttr=f' class="{TableRow.td_classes}"' if TableRow.td_classes else ""
+        tds=[]
+        for column in self.headerMap.keys():
+            value=record.get(column)
+            text="" if value is None else str(value)
+            if column not in self.htmlColumns:
+                text=html.escape(text)
+            tds.append(f"<td{classAttr}>{text}</td>")
+        rowHtml=f"<tr>{''.join(tds)}</tr>"
+        return rowHtml
+    
+    def refreshHtml(self)->bool:
+        '''
+        regenerate the html of the changed records that are currently shown
+        
+        Returns:
+            bool: True if the html of the table body changed
+        '''
+        changed=False
+        for recordId,record in self.staleRecords.items():
+            if recordId in self.rowHtmlCache:
+                self.rowHtmlCache[recordId]=self.getRowHtml(record)
+                changed=True
+        self.staleRecords={}
+        if changed:
+            self.tbody.inner_html="".join(self.rowHtmlCache.values())
+        return changed
+    
+    def react(self,data):
+        '''
+        make sure the html of changed records is current before being sent to the browser
+        
+        react is called when the whole page is sent so there are no changes left to push
+        '''
+        if self.renderAsHtml:
+            self.refreshHtml()
+        self.clearDirty()
+        
+    def clearDirty(self):
+        '''
+        forget the changes since the last push
+        '''
+        self.dirtyCells={}
+        self.dirtyRows={}
+        self.dirtyRecordCells={}
+        
+    def delete(self):
+        '''
+        free my components including the rows of cached pages that are not shown
+        '''
+        for tableRow in self.getMaterializedRows():
+            tableRow.delete()
+        self.pageCache=OrderedDict()
+        self.rowsByKey={}
+        self.rowsByRecordId={}
+        super().delete()
+        
+    def getMaterializedRows(self)->list:
+        '''
+        get all TableRow components currently built including
+        the rows of cached pages that are not shown
+        '''
+        if self.isPaged():
+            return [tableRow for rows in self.pageCache.values() for tableRow in rows]
+        return self.rows
+        
+    def indexRows(self):
+        '''
+        index the materialized rows by primary key and by record
+        '''
+        self.rowsByKey={}
+        self.rowsByRecordId={}
+        for tableRow in self.getMaterializedRows():
+            self.rowsByRecordId[id(tableRow.record)]=tableRow
+            if self.primaryKey is not None:
+                self.rowsByKey[tableRow.record[self.primaryKey]]=tableRow
+                
+    def getPageRows(self,pageIndex:int,reusableRows:dict=None)->list:
+        '''
+        get the rows of the given page from the page cache - build 
+        and cache them if the page has not been viewed recently
+        
+        Args:
+            pageIndex(int): the index of the page
+            reusableRows(dict): TableRows that may be reused by record id - the reused rows are removed
+            
+        Returns:
+            list: the TableRows of the page
+        '''
+        rows=self.pageCache.pop(pageIndex,None)
+        if rows is None:
+            start=pageIndex*self.pageSize
+            rows=[]
+            for record in self.viewRecords[start:start+self.pageSize]:
+                tableRow=reusableRows.pop(id(record),None) if reusableRows else None
+                if tableRow is None:
+                    tableRow=TableRow(table=self, record=record, headerMap=self.headerMap)
+                rows.append(tableRow)
+        # the least recently used page is the first one
+        self.pageCache[pageIndex]=rows
+        while len(self.pageCache)>self.pageCacheSize:
+            _evictedIndex,evictedRows=self.pageCache.popitem(last=False)
+            for tableRow in evictedRows:
+                tableRow.delete()
+        return rows
+    
+    def getPageCount(self)->int:
+        '''
+        get the number of pages
+        '''
+        pageCount=1
+        if self.isPaged():
+            pageCount=max(1,(len(self.viewRecords)+self.pageSize-1)//self.pageSize)
+        return pageCount
+    
+    def addPageNavigation(self):
+        '''
+        add the page navigation controls
+        '''
+        self.pageNav=jp.Div(a=self, classes=self.page_nav_classes)
+        for action,text in [("first","«"),("previous","‹"),("next","›"),("last","»")]:
+            button=jp.Button(text=text, classes=self.page_button_classes, a=self.pageNav, click=self.onPageNav)
+            button.pageAction=action
+            if action=="previous":
+                self.pageLabel=jp.Span(classes=self.page_label_classes, a=self.pageNav)
+        self.updatePageLabel()
+        
+    def updatePageLabel(self):
+        '''
+        show the current page position
+        '''
+        self.pageLabel.text=f"page {self.pageIndex+1} of {self.getPageCount()}"
+        
+    def showPage(self,pageIndex:int):
+        '''
+        show the page with the given index
+        
+        Args:
+            pageIndex(int): the index of the page to show
+        '''
+        if not self.isPaged() or self.tbody is None:
+            return
+        pageIndex=min(max(0,pageIndex),self.getPageCount()-1)
+        if pageIndex!=self.pageIndex:
+            self.pageIndex=pageIndex
+            self.renderRows()
+            self.updatePageLabel()
+            
+    def onPageNav(self,msg):
+        '''
+        handle a click on one of the page navigation buttons
+        '''
+        pageAction=msg.target.pageAction
+        pageIndexes={
+            "first": 0,
+            "previous": self.pageIndex-1,
+            "next": self.pageIndex+1,
+            "last": self.getPageCount()-1
+        }
+        self.showPage(pageIndexes[pageAction])
+            
+    def scrollTo(self,index:int):
+        '''
+        move the visible window to start at the given record index
+        
+        Args:
+            index(int): the index of the first visible record
+        '''
+        if not self.isVirtual() or self.tbody is None:
+            return
+        maxStart=max(0,len(self.viewRecords)-self.windowSize)
+        windowStart=min(max(0,index),maxStart)
+        if windowStart!=self.windowStart:
+            self.windowStart=windowStart
+            self.renderRows()
+            
+    def onWheel(self,msg):
+        '''
+        handle a wheel event of the browser by moving the visible window
+        '''
+        deltaY=msg.deltaY or 0
+        step=self.scroll_rows if deltaY>0 else -self.scroll_rows
+        self.scrollTo(self.windowStart+step)
+        
+    def getColumnIndex(self,column:str)->'ColumnIndex':
+        '''
+        get the sort order index for the given column - it is created on first use
+        and maintained on changes of the records
+        
+        Args:
+            column(str): the column to get the index for
+            
+        Returns:
+            ColumnIndex: the sort order index
+        '''
+        columnIndex=self.columnIndexes.get(column)
+        if columnIndex is None:
+            columnIndex=ColumnIndex(column,self.lod)
+            self.columnIndexes[column]=columnIndex
+        return columnIndex
+    
+    def addIndex(self,name:str,columns,unique:bool=False)->'KeyIndex':
+        '''
+        add a lookup index for the given columns that is maintained 
+        as records are added, removed or edited
+        
+        Args:
+            name(str): the name of the index
+            columns(str|List[str]): the column or the columns of a composite key
+            unique(bool): if True each key may only be used by one record
+            
+        Returns:
+            KeyIndex: the index
+        '''
+        if isinstance(columns,str):
+            columns=[columns]
+        keyIndex=KeyIndex(name,columns,unique)
+        for record in self.lod:
+            keyIndex.add(record)
+        self.keyIndexes[name]=keyIndex
+        return keyIndex
+    
+    def findRecords(self,**criteria)->List[dict]:
+        '''
+        find the records having the given column values using 
+        a matching index if there is one
+        
+        Args:
+            criteria: the column values to look for
+            
+        Returns:
+            List[dict]: the matching records
+        '''
+        if self.primaryKey is not None and set(criteria.keys())=={self.primaryKey}:
+            record=self.recordsByKey.get(criteria[self.primaryKey])
+            return [] if record is None else [record]
+        # use the index covering most of the criteria
+        bestIndex=None
+        for keyIndex in self.keyIndexes.values():
+            if set(keyIndex.columns).issubset(criteria.keys()):
+                if bestIndex is None or len(keyIndex.columns)>len(bestIndex.columns):
+                    bestIndex=keyIndex
+        if bestIndex is not None:
+            key=tuple(criteria[column] for column in bestIndex.columns)
+            records=bestIndex.lookup(key)
+        else:
+            records=self.lod
+        found=[]
+        for record in records:
+            if all(record.get(column)==value for column,value in criteria.items()):
+                found.append(record)
+        return found
+    
+    def findRows(self,**criteria)->List['TableRow']:
+        '''
+        find the materialized TableRows of the records having the given column values
+        
+        Args:
+            criteria: the column values to look for
+            
+        Returns:
+            List[TableRow]: the TableRows of the matching records that are currently materialized
+        '''
+        rows=[]
+        for record in self.findRecords(**criteria):
+            tableRow=self.rowsByRecordId.get(id(record))
+            if tableRow is not None:
+                rows.append(tableRow)
+        return rows
+    
+    def onRecordChanged(self,record:dict,column:str,oldValue,newValue):
+        '''
+        keep the indexes up to date on the change of a record
+        
+        Args:
+            record(dict): the changed record
+            column(str): the changed column
+            oldValue(object): the value before the change
+            newValue(object): the value after the change
+        '''
+        if column==self.primaryKey and oldValue!=newValue and newValue in self.recordsByKey:
+            # reject the change
+            record[column]=oldValue
+            raise UniqueKeyViolation(f"{column}={newValue} violates the primary key")
+        keyIndexes=[keyIndex for keyIndex in self.keyIndexes.values() if column in keyIndex.columns]
+        for keyIndex in keyIndexes:
+            if not keyIndex.allowsKey(record,keyIndex.getKey(record)):
+                # reject the change
+                record[column]=oldValue
+                raise UniqueKeyViolation(f"{column}={newValue} violates the unique index {keyIndex.name}")
+        for keyIndex in keyIndexes:
+            keyIndex.update(record,column,oldValue)
+        columnIndex=self.columnIndexes.get(column)
+        if columnIndex is not None:
+            columnIndex.update(record,oldValue,newValue)
+        if column==self.primaryKey and oldValue!=newValue:
+            self.recordsByKey.pop(oldValue,None)
+            self.recordsByKey[newValue]=record
+            tableRow=self.rowsByKey.pop(oldValue,None)
+            if tableRow is not None:
+                self.rowsByKey[newValue]=tableRow
+    
+    def matchesFilters(self,record:dict)->bool:
+        '''
+        check whether the given record matches all column filters
+        '''
+        for column,filterText in self.filters.items():
+            value=record.get(column)
+            text="" if value is None else str(value)
+            if filterText not in text.lower():
+                return False
+        return True
+        
+    def updateView(self,resetPosition:bool=True):
+        '''
+        sort and filter the records to be shown and rerender 
+        reordering the existing TableRows
+        
+        Args:
+            resetPosition(bool): if True show the first page / window otherwise keep the current position
+        '''
+        if self.sortColumn is None and not self.filters:
+            viewRecords=self.lod
+        else:
+            if self.sortColumn is not None:
+                records=self.getColumnIndex(self.sortColumn).getRecords(self.sortDescending)
+            else:
+                records=self.lod
+            if self.filters:
+                # columnar records are filtered vectorized if possible
+                viewRecords=records.filter(self.filters) if hasattr(records,"filter") else None
+                if viewRecords is None:
+                    viewRecords=[record for record in records if self.matchesFilters(record)]
+            else:
+                viewRecords=records
+        self.viewRecords=viewRecords
+        if self.tbody is None:
+            return
+        reusableRows={}
+        if self.isPaged():
+            reusableRows={id(tableRow.record):tableRow for tableRow in self.getMaterializedRows()}
+            self.pageCache=OrderedDict()
+            self.pageIndex=min(self.pageIndex,self.getPageCount()-1) if not resetPosition else 0
+        if self.isVirtual():
+            self.windowStart=min(self.windowStart,max(0,len(self.viewRecords)-self.windowSize)) if not resetPosition else 0
+        self.renderRows(reusableRows)
+        # free the rows that are not shown any more
+        for tableRow in reusableRows.values():
+            tableRow.delete()
+        if self.isPaged():
+            self.updatePageLabel()
+            
+    def sortBy(self,column:str,descending:bool=False):
+        '''
+        sort the table by the given column
+        
+        Args:
+            column(str): the column to sort by - None for the original order
+            descending(bool): if True sort in descending order
+        '''
+        self.sortColumn=column
+        self.sortDescending=descending
+        for headerColumn,th in self.headerCells.items():
+            header=self.headerMap[headerColumn]
+            if headerColumn==column:
+                icon=self.sort_descending_icon if descending else self.sort_ascending_icon
+                header=f"{header} {icon}"
+            th.inner_html=header
+        self.updateView()
+        
+    def setFilter(self,column:str,filterText:str):
+        '''
+        filter the table by the given text for the given column
+        
+        Args:
+            column(str): the column to filter
+            filterText(str): the text the column values need to contain (case insensitive) - empty or None to remove the filter
+        '''
+        if filterText:
+            self.filters[column]=filterText.lower()
+        else:
+            self.filters.pop(column,None)
+        self.updateView()
+        
+    def onHeaderClick(self,msg):
+        '''
+        handle a click on a column header by sorting or reversing the sort order
+        '''
+        column=msg.target.column
+        descending=column==self.sortColumn and not self.sortDescending
+        self.sortBy(column,descending)
+        
+    def onFilterChange(self,msg):
+        '''
+        handle a change of a filter input
+        '''
+        self.setFilter(msg.target.column,msg.value)
+        
+    def appendRows(self,records:List[dict])->int:
+        '''
+        append the given records to the table materializing only 
+        the rows that are shown
+        
+        Args:
+            records(List[dict]): the records to append
+            
+        Returns:
+            int: the number of records appended
+        '''
+        records=list(records)
+        if not records:
+            return 0
+        self.checkMutable("appendRows")
+        if self.tbody is None:
+            self.setupHeader(records[0])
+        oldTotal=len(self.lod)
+        self.lod.extend(records)
+        for record in records:
+            if self.primaryKey is not None:
+                self.recordsByKey[record[self.primaryKey]]=record
+            for keyIndex in self.keyIndexes.values():
+                keyIndex.add(record)
+            for columnIndex in self.columnIndexes.values():
+                columnIndex.add(record)
+        if self.viewRecords is not self.lod or self.isPaged() or self.isVirtual():
+            self.refreshRowsFrom(oldTotal)
+        elif self.renderAsHtml:
+            for record in records:
+                self.rowHtmlCache[id(record)]=self.getRowHtml(record)
+            self.tbody.inner_html+="".join(self.rowHtmlCache[id(record)] for record in records)
+        else:
+            for record in records:
+                tableRow=TableRow(table=self, record=record, headerMap=self.headerMap)
+                self.tbody.add_component(tableRow)
                 self.rows.append(tableRow)
+                self.rowsByRecordId[id(record)]=tableRow
                 if self.primaryKey is not None:
-                    key=row[primaryKey]
-                    self.rowsByKey[key]=tableRow
-        self.debugContainer=debugContainer
+                    self.rowsByKey[record[self.primaryKey]]=tableRow
+        return len(records)
+    
+    def checkMutable(self,action:str):
+        '''
+        make sure that records may be added, removed or moved
+        
+        Args:
+            action(str): the name of the action for the error message
+        '''
+        if not isinstance(self.lod,MutableSequence):
+            raise Exception(f"{action} is not possible for the read-only records of type {type(self.lod).__name__}")
+        
+    def refreshRowsFrom(self,position:int):
+        '''
+        rerender the rows that are affected by a change of the records 
+        in lod from the given position on 
+        
+        Args:
+            position(int): the index of the first changed record in lod
+        '''
+        if self.tbody is None:
+            return
+        if self.viewRecords is not self.lod:
+            # sorted or filtered view
+            self.updateView(resetPosition=False)
+        elif self.isPaged():
+            # the pages from the one holding the first changed record on are affected
+            firstPage=position//self.pageSize
+            reusableRows={}
+            for pageIndex in [pageIndex for pageIndex in self.pageCache.keys() if pageIndex>=firstPage]:
+                for tableRow in self.pageCache.pop(pageIndex):
+                    reusableRows[id(tableRow.record)]=tableRow
+            oldPageIndex=self.pageIndex
+            self.pageIndex=min(self.pageIndex,self.getPageCount()-1)
+            # the shown page is affected if its rows have been released or it does not exist any more
+            if self.pageIndex!=oldPageIndex or self.pageIndex not in self.pageCache:
+                self.renderRows(reusableRows)
+            for tableRow in reusableRows.values():
+                tableRow.delete()
+            self.indexRows()
+            self.updatePageLabel()
+        elif self.isVirtual():
+            if position<self.windowStart+self.windowSize+self.overscan:
+                self.windowStart=min(self.windowStart,max(0,len(self.lod)-self.windowSize))
+                self.renderRows()
+        else:
+            self.renderRows()
+            
+    def getRecordPosition(self,record:dict)->int:
+        '''
+        get the position of the given record in lod
+        '''
+        for position,lodRecord in enumerate(self.lod):
+            if lodRecord is record:
+                return position
+        raise Exception(f"record {record} is not part of the table")
+    
+    def isIncremental(self)->bool:
+        '''
+        check whether rows of the table may be changed without rerendering 
+        i.e. all rows are materialized as components in the order of lod
+        '''
+        return self.viewRecords is self.lod and not self.isPaged() and not self.isVirtual() and not self.renderAsHtml
+            
+    def removeRow(self,key)->dict:
+        '''
+        remove the row with the given key
+        
+        Args:
+            key(object): the primary key of the row to remove
+            
+        Returns:
+            dict: the removed record
+        '''
+        if self.primaryKey is None:
+            raise Exception("removeRow only possible when primaryKey is set")
+        self.checkMutable("removeRow")
+        record=self.recordsByKey[key]
+        position=self.getRecordPosition(record)
+        del self.lod[position]
+        del self.recordsByKey[key]
+        self.staleRecords.pop(id(record),None)
+        for column in self.headerMap.keys():
+            self.dirtyRecordCells.pop((id(record),column),None)
+        for keyIndex in self.keyIndexes.values():
+            keyIndex.remove(record)
+        for columnIndex in self.columnIndexes.values():
+            columnIndex.remove(record,record.get(columnIndex.column))
+        if self.isIncremental():
+            tableRow=self.rowsByKey.pop(key)
+            self.rowsByRecordId.pop(id(record),None)
+            self.tbody.remove_component(tableRow)
+            self.rows.remove(tableRow)
+            tableRow.delete()
+        else:
+            self.refreshRowsFrom(position)
+        return record
+    
+    def insertRow(self,index:int,record:dict):
+        '''
+        insert the given record at the given index
+        
+        Args:
+            index(int): the position in lod to insert the record at
+            record(dict): the record to insert
+        '''
+        self.checkMutable("insertRow")
+        if self.tbody is None:
+            self.setupHeader(record)
+        index=min(max(0,index),len(self.lod))
+        self.lod.insert(index,record)
+        if self.primaryKey is not None:
+            self.recordsByKey[record[self.primaryKey]]=record
+        for keyIndex in self.keyIndexes.values():
+            keyIndex.add(record)
+        for columnIndex in self.columnIndexes.values():
+            columnIndex.add(record)
+        if self.isIncremental():
+            tableRow=TableRow(table=self, record=record, headerMap=self.headerMap)
+            self.tbody.add_component(tableRow,index)
+            self.rows.insert(index,tableRow)
+            self.rowsByRecordId[id(record)]=tableRow
+            if self.primaryKey is not None:
+                self.rowsByKey[record[self.primaryKey]]=tableRow
+        else:
+            self.refreshRowsFrom(index)
+            
+    def moveRow(self,key,index:int):
+        '''
+        move the row with the given key to the given index
+        
+        Args:
+            key(object): the primary key of the row to move
+            index(int): the new position in lod
+        '''
+        if self.primaryKey is None:
+            raise Exception("moveRow only possible when primaryKey is set")
+        self.checkMutable("moveRow")
+        record=self.recordsByKey[key]
+        position=self.getRecordPosition(record)
+        del self.lod[position]
+        index=min(max(0,index),len(self.lod))
+        self.lod.insert(index,record)
+        if self.isIncremental():
+            tableRow=self.rows.pop(position)
+            self.tbody.remove_component(tableRow)
+            self.tbody.add_component(tableRow,index)
+            self.rows.insert(index,tableRow)
+        else:
+            self.refreshRowsFrom(min(position,index))
+        
+    async def stream(self,records:AsyncIterable[dict],batchSize:int=100,flushInterval:float=0.5,wp:jp.WebPage=None)->int:
+        '''
+        append the records of the given async iterable in batches 
+        and update the page for each batch
+        
+        Args:
+            records(AsyncIterable[dict]): the records to append e.g. from an async generator
+            batchSize(int): the maximum number of records per batch
+            flushInterval(float): the maximum number of seconds to wait before a partial batch is appended
+            wp(jp.WebPage): the page to update after each batch
+            
+        Returns:
+            int: the number of records appended
+        '''
+        total=0
+        batch=[]
+        iterator=records.__aiter__()
+        loop=asyncio.get_running_loop()
+        lastFlush=loop.time()
+        pending=None
+        done=False
+        while not done:
+            if pending is None:
+                pending=asyncio.ensure_future(iterator.__anext__())
+            timeout=max(0,flushInterval-(loop.time()-lastFlush))
+            finished,_pending=await asyncio.wait({pending},timeout=timeout)
+            if pending in finished:
+                try:
+                    batch.append(pending.result())
+                except StopAsyncIteration:
+                    done=True
+                pending=None
+                if not done and len(batch)<batchSize:
+                    continue
+            if batch:
+                total+=self.appendRows(batch)
+                batch=[]
+                if wp is not None:
+                    await wp.update()
+            lastFlush=loop.time()
+        return total
         
     def updateCell(self,key,column,value):
         '''
@@ -58,15 +930,302 @@ class Table(jp.Div):
         '''
         if self.primaryKey is None:
             raise Exception("updateCell only possible when primaryKey is set")
-        tableRow=self.rowsByKey[key]
-        tableRow.updateCell(column,value)
+        if key in self.rowsByKey:
+            tableRow=self.rowsByKey[key]
+            tableRow.updateCell(column,value)
+        else:
+            # the row is currently not materialized - update the record only
+            record=self.recordsByKey[key]
+            oldValue=record.get(column)
+            record[column]=value
+            self.onRecordChanged(record, column, oldValue, value)
+            if self.renderAsHtml:
+                self.staleRecords[id(record)]=record
+                if self.trackChanges:
+                    self.dirtyRecordCells[(id(record),column)]=(record,column)
         
     def getCellValue(self,key,column:str)->object:
         if self.primaryKey is None:
             raise Exception("getCellValue only possible when primaryKey is set")
-        tableRow=self.rowsByKey[key]
-        value=tableRow.getCellValue(column)
+        if key in self.rowsByKey:
+            tableRow=self.rowsByKey[key]
+            value=tableRow.getCellValue(column)
+        else:
+            value=self.recordsByKey[key].get(column)
         return value
+    
+    def applyCells(self,cells:Iterable[Tuple])->Set:
+        '''
+        apply the given batch of cell changes without updating any page
+        
+        Args:
+            cells(Iterable[Tuple]): (key,column,value) tuples
+            
+        Returns:
+            Set: the keys of the rows that actually changed
+        '''
+        if self.primaryKey is None:
+            raise Exception("applyCells only possible when primaryKey is set")
+        changedKeys=set()
+        for key,column,value in cells:
+            record=self.recordsByKey[key]
+            if column in record and record[column]==value:
+                continue
+            self.updateCell(key, column, value)
+            changedKeys.add(key)
+        return changedKeys
+        
+    async def updateCells(self,cells:Iterable[Tuple],wp:jp.WebPage=None)->Set:
+        '''
+        update the given batch of cells and push the changes - a large batch is pushed 
+        with a single message see pushChanges
+        
+        Args:
+            cells(Iterable[Tuple]): (key,column,value) tuples
+            wp(jp.WebPage): the page to push the changed cells to - if None the caller is responsible e.g. by returning from an event handler
+            
+        Returns:
+            Set: the keys of the rows that actually changed
+        '''
+        changedKeys=self.applyCells(cells)
+        if changedKeys and wp is not None:
+            await self.pushChanges(wp)
+        return changedKeys
+    
+    async def updateRows(self,rows:Dict[object,dict],wp:jp.WebPage=None)->Set:
+        '''
+        update the given records with a single update for the whole batch
+        
+        Args:
+            rows(Dict[object,dict]): the column values to set by primary key
+            wp(jp.WebPage): the page to push the changed cells to - if None the caller is responsible e.g. by returning from an event handler
+        
+        Returns:
+            Set: the keys of the rows that actually changed
+        '''
+        cells=((key,column,value) for key,record in rows.items() for column,value in record.items())
+        changedKeys=await self.updateCells(cells, wp)
+        return changedKeys
+    
+    def markDirty(self,cell:'TableData'):
+        '''
+        remember the given cell as changed since the last push
+        '''
+        if self.trackChanges:
+            self.dirtyCells[id(cell)]=cell
+        
+    def journalChange(self,record:dict,column:str,oldValue,newValue)->'Change':
+        '''
+        record an edit of the given record in the journal and schedule 
+        its write back to the change sink
+        
+        Args:
+            record(dict): the edited record
+            column(str): the edited column
+            oldValue(object): the value before the edit
+            newValue(object): the value after the edit
+            
+        Returns:
+            Change: the journal entry
+        '''
+        key=record.get(self.primaryKey) if self.primaryKey is not None else None
+        change=Change(key=key,column=column,oldValue=oldValue,newValue=newValue,timestamp=datetime.now())
+        self.journal.append(change)
+        if self.changeSink is not None:
+            self.pendingChanges.append(change)
+            self.scheduleFlush()
+        return change
+    
+    def scheduleFlush(self):
+        '''
+        make sure the pending changes are written back - immediately if 
+        the flushSize is reached otherwise after the flushInterval
+        
+        without a running event loop the pending changes need to be 
+        written back by awaiting flushChanges
+        '''
+        try:
+            loop=asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self.flushTask is None or self.flushTask.done():
+            # the event is bound to the loop of the flusher
+            self.flushEvent=asyncio.Event()
+            self.flushTask=loop.create_task(self.runFlusher())
+        if len(self.pendingChanges)>=self.flushSize:
+            self.flushEvent.set()
+            
+    async def runFlusher(self):
+        '''
+        write back the pending changes batch by batch until there are none left
+        - a batch that is being written is never interrupted and the changes
+        arriving in the meantime are part of the next batch
+        '''
+        while self.pendingChanges:
+            if len(self.pendingChanges)<self.flushSize:
+                self.flushEvent.clear()
+                try:
+                    await asyncio.wait_for(self.flushEvent.wait(),self.flushInterval)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self.flushChanges()
+            except Exception as ex:
+                # the changes are kept pending and retried with the next edit or flushChanges call
+                if self.debugContainer is not None:
+                    self.debugContainer.addMessage(f"{datetime.now().isoformat()} write back of {len(self.pendingChanges)} changes failed: {ex}")
+                break
+    
+    async def flushChanges(self,delay:float=None)->int:
+        '''
+        write back the pending changes to the change sink as a single batch
+        
+        Args:
+            delay(float): seconds to wait before writing back - changes arriving in the meantime are part of the batch
+            
+        Returns:
+            int: the number of changes written back
+        '''
+        if delay is not None:
+            await asyncio.sleep(delay)
+        loop=asyncio.get_running_loop()
+        if self.flushLock is None or self.flushLockLoop is not loop:
+            self.flushLock=asyncio.Lock()
+            self.flushLockLoop=loop
+        # only one batch is written at a time to keep the order of the changes
+        async with self.flushLock:
+            if self.changeSink is None or not self.pendingChanges:
+                return 0
+            batch=self.pendingChanges
+            self.pendingChanges=[]
+            try:
+                await self.changeSink.writeChanges(batch)
+            except BaseException as ex:
+                # keep the changes for the next attempt - also on cancellation
+                self.pendingChanges=batch+self.pendingChanges
+                raise ex
+        return len(batch)
+        
+    def exportRows(self,exportFormat:str="csv",chunkSize:int=1000)->Iterator[str]:
+        '''
+        export the records as currently shown - sorted, filtered and with the
+        columns of the headerMap - chunk by chunk without building the whole export
+        
+        Args:
+            exportFormat(str): csv or jsonl (JSON lines)
+            chunkSize(int): number of records per chunk
+            
+        Returns:
+            Iterator[str]: the chunks of the export
+        '''
+        if exportFormat not in ["csv","jsonl"]:
+            raise Exception(f"unsupported export format {exportFormat}")
+        columns=list(self.headerMap.keys()) if self.headerMap else []
+        buffer=io.StringIO()
+        writer=csv.writer(buffer)
+        if exportFormat=="csv":
+            writer.writerow([self.headerMap[column] for column in columns])
+        for start in range(0,len(self.viewRecords),chunkSize):
+            for record in self.viewRecords[start:start+chunkSize]:
+                if exportFormat=="csv":
+                    writer.writerow(["" if record.get(column) is None else record.get(column) for column in columns])
+                else:
+                    buffer.write(json.dumps({column:record.get(column) for column in columns},default=str))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell()>0:
+            yield buffer.getvalue()
+            
+    def getExportResponse(self,exportFormat:str="csv",filename:str=None,chunkSize:int=1000)->StreamingResponse:
+        '''
+        get a streaming download response of the export - to be returned by a starlette route e.g.
+        
+        jp.app.add_route("/export.csv",lambda request:table.getExportResponse())
+        
+        Args:
+            exportFormat(str): csv or jsonl (JSON lines)
+            filename(str): the name of the downloaded file
+            chunkSize(int): number of records per chunk
+            
+        Returns:
+            StreamingResponse: the response streaming the export
+        '''
+        mediaTypes={"csv":"text/csv","jsonl":"application/x-ndjson"}
+        if exportFormat not in mediaTypes:
+            raise Exception(f"unsupported export format {exportFormat}")
+        if filename is None:
+            filename=f"table.{exportFormat}"
+        headers={"Content-Disposition":f'attachment; filename="{filename}"'}
+        response=StreamingResponse(self.exportRows(exportFormat, chunkSize),media_type=mediaTypes[exportFormat],headers=headers)
+        return response
+        
+    def markRowDirty(self,tableRow:'TableRow',column:str):
+        '''
+        remember the given compact cell of the given row as changed since the last push
+        '''
+        if not self.trackChanges:
+            return
+        _tableRow,columns=self.dirtyRows.setdefault(id(tableRow),(tableRow,set()))
+        columns.add(column)
+        
+    def getDelta(self)->List[Tuple]:
+        '''
+        get the changes since the last push
+        
+        Returns:
+            List[Tuple]: (key,column,value) tuples of the changed cells - the key is None if no primaryKey is set
+        '''
+        delta=[]
+        for cell in self.dirtyCells.values():
+            key=cell.row.record.get(self.primaryKey) if self.primaryKey is not None else None
+            delta.append((key,cell.label,cell.getValue()))
+        for tableRow,columns in self.dirtyRows.values():
+            key=tableRow.record.get(self.primaryKey) if self.primaryKey is not None else None
+            for column in columns:
+                delta.append((key,column,tableRow.getCellValue(column)))
+        for record,column in self.dirtyRecordCells.values():
+            delta.append((record.get(self.primaryKey),column,record.get(column)))
+        return delta
+        
+    async def pushChanges(self,wp:jp.WebPage)->int:
+        '''
+        send only the cells changed since the last push to the browsers showing the given page
+        instead of the whole page - when rendering as html or if more than push_batch_limit
+        cells and rows changed the table body is sent once
+        
+        Args:
+            wp(jp.WebPage): the page to push the changes to
+            
+        Returns:
+            int: the number of cells sent
+        '''
+        visibleRowIds={id(tableRow) for tableRow in self.rows}
+        components=[cell for cell in self.dirtyCells.values() if id(cell.row) in visibleRowIds]
+        self.dirtyCells={}
+        pushed=len(components)
+        for tableRow,columns in self.dirtyRows.values():
+            if id(tableRow) in visibleRowIds:
+                # compact cells are sent with their row
+                components.append(tableRow)
+                pushed+=len(columns)
+        self.dirtyRows={}
+        if len(components)>self.push_batch_limit:
+            # one message for the whole batch instead of one per cell
+            components=[self.tbody]
+        if self.renderAsHtml:
+            self.refreshHtml()
+            htmlCells=[recordId for recordId,_column in self.dirtyRecordCells.keys() if recordId in self.rowHtmlCache]
+            self.dirtyRecordCells={}
+            if htmlCells:
+                components=[self.tbody]
+                pushed+=len(htmlCells)
+        websockets=list(jp.WebPage.sockets.get(wp.page_id,{}).values())
+        for component in components:
+            for websocket in websockets:
+                await component.update(websocket)
+        return pushed
         
 
 class TableRow(jp.Tr):
@@ -75,18 +1234,32 @@ class TableRow(jp.Tr):
     '''
     td_classes = ''
 
+    # prototype of the dict sent to the browser for a compact cell
+    compact_cell_dict = None
+
     def __init__(self, table,record:dict, headerMap:dict,  **kwargs):
         '''
         constructor
         '''
+        if table.lazyInput:
+            # the row needs a stable id to receive the click events of its cells
+            kwargs["temp"]=False
         super().__init__(**kwargs)
         self.table=table
         self.record = record
         self.headerMap=headerMap
         self.cellsMap = {}
-        for column in headerMap.keys():
-            cell = TableData(a=self, inputValue=self.record.get(column), label=column, classes=self.td_classes, row=self,allowInput=self.table.allowInput)
-            self.cellsMap[column]=cell
+        # TableData components of the cells in edit mode by column when using lazyInput
+        self.editCells = {}
+        self.inputDisabled=False
+        if table.lazyInput:
+            for column in headerMap.keys():
+                self.cellsMap[column]=CompactCell(self.record.get(column),column)
+            self.on("click",self.onCellClick)
+        else:
+            for column in headerMap.keys():
+                cell = TableData(a=self, inputValue=self.record.get(column), label=column, classes=self.td_classes, row=self,allowInput=self.table.allowInput)
+                self.cellsMap[column]=cell
             
     def updateCell(self,column:str,value):
         '''
@@ -94,7 +1267,12 @@ class TableRow(jp.Tr):
         '''
         if column in self.cellsMap:
             cell=self.cellsMap[column]
+            self.updateRowRecord(column, value)
             cell.setValue(value)
+            if column in self.editCells:
+                self.editCells[column].setValue(value)
+            elif isinstance(cell,CompactCell):
+                self.table.markRowDirty(self, column)
             
     def getCell(self,column:str):
         '''
@@ -107,7 +1285,9 @@ class TableRow(jp.Tr):
             TableData: the cell or None if the column does not exist
         '''
         cell=None
-        if column in self.cellsMap:
+        if column in self.editCells:
+            cell=self.editCells[column]
+        elif column in self.cellsMap:
             cell=self.cellsMap[column]
         return cell
         
@@ -140,15 +1320,109 @@ class TableRow(jp.Tr):
         """
         oldValue = self.record.get(key)
         self.record[key] = value
+        self.table.onRecordChanged(self.record, key, oldValue, value)
         return oldValue
 
     def disableInput(self,disabled):
         """
         Disables or Enables input fields of the row
         """
-        for cell in self.cellsMap.values():
+        self.inputDisabled=disabled
+        cells=self.editCells.values() if self.table.lazyInput else self.cellsMap.values()
+        for cell in cells:
             if cell.isInput:
                 cell.input.disabled=disabled
+                
+    def startEdit(self,column:str)->'TableData':
+        '''
+        switch the compact cell at the given column to edit mode by 
+        creating its input control - a cell of another row or column
+        that is in edit mode is switched back
+        
+        Args:
+            column(str): the column of the cell to edit
+            
+        Returns:
+            TableData: the cell in edit mode or None if the row does not allow input
+        '''
+        if not self.table.lazyInput or self.inputDisabled or column not in self.cellsMap:
+            return None
+        if column in self.editCells:
+            return self.editCells[column]
+        if self.table.editCell is not None:
+            editRow,editColumn=self.table.editCell
+            editRow.stopEdit(editColumn)
+        cell=self.cellsMap[column]
+        editCell=TableData(inputValue=cell.value, label=column, classes=self.td_classes, row=self)
+        self.editCells[column]=editCell
+        self.table.editCell=(self,column)
+        return editCell
+    
+    def stopEdit(self,column:str):
+        '''
+        switch the cell at the given column back to a compact cell
+        and free its input control
+        
+        Args:
+            column(str): the column of the cell in edit mode
+        '''
+        editCell=self.editCells.pop(column,None)
+        if editCell is None:
+            return
+        self.cellsMap[column].setValue(self.record.get(column))
+        self.table.dirtyCells.pop(id(editCell),None)
+        editCell.delete()
+        if self.table.editCell==(self,column):
+            self.table.editCell=None
+        
+    def onCellClick(self,msg):
+        '''
+        handle a click on a compact cell by switching it to edit mode
+        '''
+        cellId=str(msg.event_target)
+        prefix=f"{self.id}-"
+        if cellId.startswith(prefix):
+            columnIndex=cellId[len(prefix):]
+            if columnIndex.isdigit() and int(columnIndex)<len(self.cellsMap):
+                column=list(self.cellsMap.keys())[int(columnIndex)]
+                self.startEdit(column)
+                
+    def getCompactCellDict(self,columnIndex:int,cell:'CompactCell')->dict:
+        '''
+        get the dict sent to the browser for the given compact cell
+        '''
+        if TableRow.compact_cell_dict is None:
+            TableRow.compact_cell_dict=jp.Td(temp=True).convert_object_to_dict()
+        d=dict(TableRow.compact_cell_dict)
+        d["attrs"]={"id":f"{self.id}-{columnIndex}"}
+        d["classes"]=self.td_classes
+        d["inner_html"]=html.escape(self.table.getColumnType(cell.column).format(cell.value))
+        return d
+    
+    def convert_object_to_dict(self):
+        d=super().convert_object_to_dict()
+        if self.table.lazyInput:
+            objectProps=[]
+            for columnIndex,(column,cell) in enumerate(self.cellsMap.items()):
+                editCell=self.editCells.get(column)
+                if editCell is not None:
+                    objectProps.append(editCell.convert_object_to_dict())
+                else:
+                    objectProps.append(self.getCompactCellDict(columnIndex,cell))
+            d["object_props"]=objectProps
+        return d
+    
+    def delete(self):
+        # a deleted row has no changes to push any more
+        self.table.dirtyRows.pop(id(self),None)
+        for cell in list(self.cellsMap.values())+list(self.editCells.values()):
+            self.table.dirtyCells.pop(id(cell),None)
+        for editCell in self.editCells.values():
+            editCell.delete()
+        self.editCells={}
+        if self.table.editCell is not None and self.table.editCell[0] is self:
+            self.table.editCell=None
+        super().delete()
 
 class TableData(jp.Td):
     '''
@@ -158,6 +1432,8 @@ class TableData(jp.Td):
         '''
         constructor
         '''
+        # cells need a stable id to be updated individually in the browser
+        kwargs["temp"]=False
         super(TableData, self).__init__(**kwargs)
         self.row = row
         self.label = label
@@ -165,10 +1441,28 @@ class TableData(jp.Td):
         self.inputValue=inputValue
         if allowInput:
             self.control = self.getInput()
+            self.input = self.control
             self.isControl=True
         else:
             self.inner_html=inputValue
             self.isControl=False
+        self.trackChanges=True
+        
+    @property
+    def inner_html(self):
+        return self._inner_html
+    
+    @inner_html.setter
+    def inner_html(self,inner_html):
+        self._inner_html=inner_html
+        self.markDirty()
+        
+    def markDirty(self):
+        '''
+        mark me as changed since the last push to the browser
+        '''
+        if getattr(self,"trackChanges",False):
+            self.row.table.markDirty(self)
             
     def setControl(self,control):
         '''
@@ -189,21 +1483,20 @@ class TableData(jp.Td):
         '''
         self.inputValue=value
         if self.isInput:
-            self.input.value=value
+            self.input.value=self.row.table.getColumnType(self.label).format(value)
         elif self.isControl:
             # TODO -define value for controls
             pass
         else:
             self.inner_html=value
+        self.markDirty()
             
     def getValue(self):
         return self.inputValue
         
     def getInput(self):
-        if isinstance(self.inputValue, datetime):
-            jpinput = jp.InputChangeOnly(a=self, type='date', value=self.inputValue.date().isoformat(), classes="form-input px-4 py-3 rounded-full")
-        else:
-            jpinput = jp.InputChangeOnly(a=self, value=self.inputValue, classes="form-input px-4 py-3 rounded-full")
+        columnType=self.row.table.getColumnType(self.label)
+        jpinput = jp.InputChangeOnly(a=self, type=columnType.inputType, value=columnType.format(self.inputValue), classes="form-input px-4 py-3 rounded-full")
         jpinput.on("change", self.on_input_change)
         jpinput.row = self.row
         jpinput.label = self.label
@@ -211,13 +1504,367 @@ class TableData(jp.Td):
 
     @staticmethod
     def on_input_change(self, msg):
-        newValue = msg.value
-        oldValue = self.row.updateRowRecord(self.a.label, newValue)
+        table=self.row.table
+        try:
+            newValue = table.getColumnType(self.a.label).parse(msg.value)
+            oldValue = self.row.updateRowRecord(self.a.label, newValue)
+        except (ValueError,UniqueKeyViolation) as ex:
+            # keep the record unchanged and show the old value again
+            self.value=table.getColumnType(self.a.label).format(self.row.record.get(self.a.label))
+            if table.debugContainer is not None:
+                table.debugContainer.addMessage(f"{datetime.now().isoformat()} Invalid value '{msg.value}' for {self.label}: {ex}")
+            return
         #update record
-        msg = f"{datetime.now().isoformat()} Changed {self.label} from '{oldValue}' to '{newValue}'"
+        change=self.row.table.journalChange(self.row.record, self.a.label, oldValue, newValue)
+        msg = f"{change.timestamp.isoformat()} Changed {self.label} from '{oldValue}' to '{newValue}'"
         debugContainer=self.row.table.debugContainer
         if debugContainer is not None:
             debugContainer.addMessage(msg)
+        if self.row.table.lazyInput:
+            # leave the edit mode
+            self.row.stopEdit(self.a.label)
+
+
+class ColumnType:
+    '''
+    the type of a table column with the input type to edit it and 
+    the converters between its values and their text representation
+    '''
+    
+    def __init__(self,name:str,pythonType:type,inputType:str="text",parse:Callable=None,format:Callable=None):
+        '''
+        constructor
+        
+        Args:
+            name(str): the name of the type
+            pythonType(type): the type of the values
+            inputType(str): the type of the html input to edit the values with
+            parse(Callable): function to convert the text of an input to a value - raises ValueError for invalid text
+            format(Callable): function to convert a value to the text of an input
+        '''
+        self.name=name
+        self.pythonType=pythonType
+        self.inputType=inputType
+        self.parseValue=parse if parse is not None else pythonType
+        self.formatValue=format if format is not None else str
+        
+    def __repr__(self)->str:
+        return f"ColumnType({self.name})"
+        
+    def parse(self,text):
+        '''
+        convert the given input text to a value - empty text is None 
+        except for text columns
+        '''
+        if text is None or (text=="" and self.pythonType is not str):
+            return None
+        if isinstance(text,self.pythonType) and not (isinstance(text,bool) and self.pythonType is int):
+            return text
+        return self.parseValue(text)
+    
+    def format(self,value)->str:
+        '''
+        convert the given value to the text of an input
+        '''
+        if value is None:
+            return ""
+        if not isinstance(value,self.pythonType):
+            return str(value)
+        return self.formatValue(value)
+    
+    @staticmethod
+    def parseBool(text:str)->bool:
+        text=str(text).strip().lower()
+        if text in ["true","1","yes","y"]:
+            return True
+        if text in ["false","0","no","n"]:
+            return False
+        raise ValueError(f"invalid boolean '{text}'")
+    
+    @classmethod
+    def forType(cls,pythonType:type)->'ColumnType':
+        '''
+        get the column type for the given python type
+        '''
+        for columnType in cls.getTypes():
+            if columnType.pythonType is pythonType:
+                return columnType
+        return cls.TEXT
+    
+    @classmethod
+    def getTypes(cls)->List['ColumnType']:
+        return [cls.TEXT,cls.BOOL,cls.INT,cls.FLOAT,cls.DATETIME,cls.DATE]
+    
+    @classmethod
+    def infer(cls,values:list)->'ColumnType':
+        '''
+        infer the column type from the given sample of values
+        
+        Args:
+            values(list): the sample values - None values are ignored
+            
+        Returns:
+            ColumnType: the most specific type that fits all values - TEXT if there is none
+        '''
+        types={type(value) for value in values if value is not None}
+        if not types:
+            return cls.TEXT
+        if types=={bool}:
+            return cls.BOOL
+        if types=={int}:
+            return cls.INT
+        if types<={int,float}:
+            return cls.FLOAT
+        if types=={datetime}:
+            return cls.DATETIME
+        if types=={date}:
+            return cls.DATE
+        return cls.TEXT
+    
+ColumnType.TEXT=ColumnType("text",str)
+ColumnType.BOOL=ColumnType("bool",bool,parse=ColumnType.parseBool)
+ColumnType.INT=ColumnType("int",int,inputType="number")
+ColumnType.FLOAT=ColumnType("float",float,inputType="number")
+# datetimes are edited by date only as before
+ColumnType.DATETIME=ColumnType("datetime",datetime,inputType="date",parse=datetime.fromisoformat,format=lambda value:value.date().isoformat())
+ColumnType.DATE=ColumnType("date",date,inputType="date",parse=date.fromisoformat,format=date.isoformat)
 
+class UniqueKeyViolation(Exception):
+    '''
+    a change of a record that would give it the key of another record
+    in the primary key or a unique index
+    '''
+    
+@dataclass
+class Change:
+    '''
+    an edit of a table cell
+    '''
+    key: object
+    column: str
+    oldValue: object
+    newValue: object
+    timestamp: datetime
 
+class ChangeSinkInterface:
+    '''
+    interface for writing back the edits of a Table e.g. to a database
+    '''
+    
+    async def writeChanges(self,changes:List[Change]):
+        '''
+        write back the given batch of changes e.g. with a single bulk update
+        
+        Args:
+            changes(List[Change]): the changes in the order they have been made
+        '''
+        raise NotImplementedError(f"{self.__class__.__name__} needs to implement writeChanges")
+    
+class CompactCell:
+    '''
+    a lightweight table cell holding only its value and column
+    that is rendered by its TableRow - the input control is only 
+    created when the cell is edited
+    '''
+    __slots__ = ("value","column")
+    
+    def __init__(self,value,column:str):
+        self.value=value
+        self.column=column
+        
+    @property
+    def label(self)->str:
+        return self.column
+        
+    def setValue(self,value):
+        self.value=value
+        
+    def getValue(self):
+        return self.value
+        
+class ColumnIndex:
+    '''
+    the records of a table in the sort order of a column
+    '''
+    
+    def __init__(self,column:str,lod:List[dict]):
+        '''
+        constructor
+        
+        Args:
+            column(str): the column to sort by
+            lod(List[dict]): the records to sort
+        '''
+        self.column=column
+        order=lod.argsort(column) if hasattr(lod,"argsort") else None
+        if order is not None:
+            # a lazy view in the vectorized sort order - the records and their 
+            # sort keys are only materialized when the index is changed
+            self.records=lod.take(order)
+            self._keys=None
+        else:
+            self.records=sorted(lod,key=lambda record:ColumnIndex.getSortKey(record.get(column)))
+            self._keys=[ColumnIndex.getSortKey(record.get(column)) for record in self.records]
+            
+    @property
+    def keys(self)->list:
+        '''
+        the sort keys of the records
+        '''
+        if self._keys is None:
+            self.records=list(self.records)
+            self._keys=[ColumnIndex.getSortKey(record.get(self.column)) for record in self.records]
+        return self._keys
+    
+    def getRecords(self,descending:bool=False):
+        '''
+        get the records in sort order
+        
+        Args:
+            descending(bool): if True get the records in descending order
+            
+        Returns:
+            Sequence: a copy of the sorted records or a read-only view if the index is lazy
+        '''
+        if isinstance(self.records,list):
+            return self.records[::-1] if descending else list(self.records)
+        return self.records.reversed() if descending else self.records
+        
+    @staticmethod
+    def getSortKey(value)->tuple:
+        '''
+        get a sort key for the given value that allows to compare values of mixed types
+        numbers are sorted first then other values by their text and None values last
+        '''
+        if value is None:
+            return (2,0,"")
+        if isinstance(value,(int,float)) and not isinstance(value,bool):
+            return (0,value,"")
+        return (1,0,str(value))
+    
+    def add(self,record:dict):
+        '''
+        add the given record at its sort position
+        
+        Args:
+            record(dict): the record to add
+        '''
+        key=ColumnIndex.getSortKey(record.get(self.column))
+        pos=bisect.bisect_right(self.keys,key)
+        self.keys.insert(pos,key)
+        self.records.insert(pos,record)
+    
+    def update(self,record:dict,oldValue,newValue):
+        '''
+        move the given record to the sort position of its new value
+        
+        Args:
+            record(dict): the changed record
+            oldValue(object): the value before the change
+            newValue(object): the value after the change
+        '''
+        if self.remove(record,oldValue):
+            self.add(record)
+            
+    def remove(self,record:dict,value)->bool:
+        '''
+        remove the given record
+        
+        Args:
+            record(dict): the record to remove
+            value(object): the value the record is indexed with
+            
+        Returns:
+            bool: True if the record was found
+        '''
+        key=ColumnIndex.getSortKey(value)
+        pos=bisect.bisect_left(self.keys,key)
+        while pos<len(self.records) and self.keys[pos]==key and self.records[pos] is not record:
+            pos+=1
+        if pos>=len(self.records) or self.records[pos] is not record:
+            # the record is not where its value belongs to
+            pos=next((i for i,indexed in enumerate(self.records) if indexed is record),None)
+            if pos is None:
+                return False
+        del self.keys[pos]
+        del self.records[pos]
+        return True
 
+class KeyIndex:
+    '''
+    a lookup index of records by the values of one or more columns
+    '''
+    
+    def __init__(self,name:str,columns:List[str],unique:bool=False):
+        '''
+        constructor
+        
+        Args:
+            name(str): the name of the index
+            columns(List[str]): the columns making up the key
+            unique(bool): if True each key may only be used by one record
+        '''
+        self.name=name
+        self.columns=columns
+        self.unique=unique
+        # the records by key
+        self.entries={}
+        
+    def getKey(self,record:dict,column:str=None,value=None)->tuple:
+        '''
+        get the key of the given record 
+        
+        Args:
+            record(dict): the record
+            column(str): a column whose value is to be replaced e.g. by the value before a change
+            value(object): the value to use for the given column
+        '''
+        key=tuple(value if keyColumn==column else record.get(keyColumn) for keyColumn in self.columns)
+        return key
+    
+    def allowsKey(self,record:dict,key:tuple)->bool:
+        '''
+        check whether the given record may use the given key
+        '''
+        if not self.unique:
+            return True
+        records=self.entries.get(key,[])
+        return all(indexed is record for indexed in records)
+    
+    def add(self,record:dict):
+        '''
+        add the given record
+        '''
+        key=self.getKey(record)
+        if not self.allowsKey(record,key):
+            raise UniqueKeyViolation(f"duplicate key {key} for unique index {self.name}")
+        self.entries.setdefault(key,[]).append(record)
+        
+    def remove(self,record:dict,key:tuple=None):
+        '''
+        remove the given record
+        
+        Args:
+            record(dict): the record to remove
+            key(tuple): the key the record is indexed with - if None the current key of the record
+        '''
+        if key is None:
+            key=self.getKey(record)
+        records=self.entries.get(key)
+        if records is not None:
+            records[:]=[indexed for indexed in records if indexed is not record]
+            if not records:
+                del self.entries[key]
+                
+    def update(self,record:dict,column:str,oldValue):
+        '''
+        reindex the given record after the value of the given column changed
+        '''
+        self.remove(record,self.getKey(record,column,oldValue))
+        self.add(record)
+        
+    def lookup(self,key:tuple)->List[dict]:
+        '''
+        get the records with the given key
+        '''
+        return self.entries.get(key,[])
@@ -3,21 +3,292 @@ Created on 2022-05-22
 
 @author: wf
 '''
-from typing import List, Union, Tuple
+import asyncio
+import difflib
+from functools import lru_cache
+import hashlib
+import html
+import inspect
+import json
+import sys
+from typing import Callable, List, Union, Tuple
 
+from addict import Dict
 import justpy as jp
+from starlette.responses import Response
+from starlette.routing import Route
+
+class LodGridDataSource:
+    '''
+    interface for a python side data source that answers the row block
+    requests of a LodGrid using the infinite row model
+    '''
+
+    def getRows(self,startRow:int,endRow:int,sortModel:list,filterModel:dict)->Tuple[List[dict],int]:
+        '''
+        get the rows of the given block - may also be implemented as async method
+
+        Args:
+            startRow(int): index of the first row of the block
+            endRow(int): index after the last row of the block
+            sortModel(list): ag-Grid sort model - list of dicts with colId and sort (asc/desc)
+            filterModel(dict): ag-Grid filter model by column
+
+        Returns:
+            Tuple[List[dict],int]: the rows and the total number of rows or -1 if not known yet
+        '''
+        raise NotImplementedError(f"{self.__class__.__name__} needs to implement getRows")
+
+class LodDataSource(LodGridDataSource):
+    '''
+    a data source for a list of dicts that sorts and filters on the server side
+    '''
+
+    def __init__(self,lod:List[dict]):
+        '''
+        constructor
+
+        Args:
+            lod(List[dict]): the list of dicts
+        '''
+        self.lod=lod
+        # the sorted and filtered rows of the last request and its sort and filter model
+        self.viewKey=None
+        self.view=lod
+
+    @staticmethod
+    def getSortKey(value)->tuple:
+        '''
+        get a sort key that allows comparing mixed and None values
+        '''
+        if isinstance(value,(int,float)) and not isinstance(value,bool):
+            return (0,value,"")
+        if value is None:
+            return (2,0,"")
+        return (1,0,str(value))
+
+    @staticmethod
+    def matches(value,columnFilter:dict)->bool:
+        '''
+        check whether the given value matches the given ag-Grid column filter
+        which may combine several conditions with an AND/OR operator
+        '''
+        if "operator" in columnFilter:
+            conditions=columnFilter.get("conditions")
+            if conditions is None:
+                # ag-Grid before v29 combines at most two conditions
+                conditions=[columnFilter[key] for key in ["condition1","condition2"] if key in columnFilter]
+            operator=str(columnFilter["operator"]).upper()
+            if operator not in ["AND","OR"]:
+                raise Exception(f"unsupported filter operator {operator}")
+            combine=all if operator=="AND" else any
+            return combine(LodDataSource.matches(value,condition) for condition in conditions)
+        condition=columnFilter.get("type","contains")
+        filterValue=columnFilter.get("filter")
+        if columnFilter.get("filterType")=="number":
+            if value is None or filterValue is None:
+                return condition in ["notEqual"] or value==filterValue
+            comparisons={
+                "equals":lambda:value==filterValue,
+                "notEqual":lambda:value!=filterValue,
+                "greaterThan":lambda:value>filterValue,
+                "greaterThanOrEqual":lambda:value>=filterValue,
+                "lessThan":lambda:value<filterValue,
+                "lessThanOrEqual":lambda:value<=filterValue,
+                "inRange":lambda:filterValue<=value<=columnFilter.get("filterTo",filterValue)
+            }
+        else:
+            text="" if value is None else str(value).lower()
+            filterText="" if filterValue is None else str(filterValue).lower()
+            comparisons={
+                "contains":lambda:filterText in text,
+                "notContains":lambda:filterText not in text,
+                "equals":lambda:text==filterText,
+                "notEqual":lambda:text!=filterText,
+                "startsWith":lambda:text.startswith(filterText),
+                "endsWith":lambda:text.endswith(filterText)
+            }
+        comparison=comparisons.get(condition)
+        return comparison() if comparison is not None else True
+
+    def getView(self,sortModel:list,filterModel:dict)->List[dict]:
+        '''
+        get the rows sorted and filtered according to the given models
+        reusing the result of the previous request for the same models
+        '''
+        viewKey=json.dumps([sortModel,filterModel],sort_keys=True,default=str)
+        if viewKey!=self.viewKey:
+            view=self.lod
+            if filterModel:
+                view=[row for row in view if all(self.matches(row.get(column),columnFilter) for column,columnFilter in filterModel.items())]
+            if sortModel:
+                view=list(view)
+                # stable sorts from the least to the most significant column
+                for sortColumn in reversed(sortModel):
+                    column=sortColumn["colId"]
+                    view.sort(key=lambda row:self.getSortKey(row.get(column)),reverse=sortColumn.get("sort")=="desc")
+            self.view=view
+            self.viewKey=viewKey
+        return self.view
+
+    def getRows(self,startRow:int,endRow:int,sortModel:list,filterModel:dict)->Tuple[List[dict],int]:
+        view=self.getView(sortModel, filterModel)
+        return view[startRow:endRow],len(view)
+
+class LodDataset:
+    '''
+    a named read-only list of dicts that is shared by all LodGrids and sessions
+    of the process - the rows are serialized to json only once and the browsers
+    fetch the cached json instead of getting the rows embedded in each page
+    '''
+    # the registered datasets by name
+    datasets={}
+    route_path="/lodgrid/datasets/{name}"
+    routeAdded=False
+
+    def __init__(self,name:str,lod:List[dict],columnDefs:List[dict]=None):
+        '''
+        constructor
+
+        Args:
+            name(str): the name of the dataset
+            lod(List[dict]): the rows - they must not be modified after registration
+            columnDefs(List[dict]): the column definitions - derived from the first row if not given
+        '''
+        self.name=name
+        self.rows=tuple(lod)
+        self.columnDefs=columnDefs
+        self.json=None
+
+    @classmethod
+    def register(cls,name:str,lod:List[dict],columnDefs:List[dict]=None)->'LodDataset':
+        '''
+        register the given rows as shared dataset under the given name
+
+        Returns:
+            LodDataset: the dataset
+        '''
+        if name in cls.datasets:
+            raise Exception(f"dataset {name} is already registered")
+        dataset=cls(name,lod,columnDefs)
+        cls.datasets[name]=dataset
+        cls.addRoute()
+        return dataset
+
+    @classmethod
+    def unregister(cls,name:str):
+        '''
+        free the dataset with the given name
+        '''
+        cls.datasets.pop(name,None)
+
+    @classmethod
+    def get(cls,name:str)->'LodDataset':
+        if name not in cls.datasets:
+            raise Exception(f"dataset {name} is not registered")
+        return cls.datasets[name]
+
+    def getJson(self)->bytes:
+        '''
+        get the rows as json - serialized on first use only
+        '''
+        if self.json is None:
+            self.json=json.dumps(self.rows,default=str).encode("utf-8")
+        return self.json
+
+    def getUrl(self)->str:
+        return LodDataset.route_path.replace("{name}",self.name)
+
+    @classmethod
+    async def datasetEndpoint(cls,request)->Response:
+        name=request.path_params["name"]
+        dataset=cls.datasets.get(name)
+        if dataset is None:
+            return Response(status_code=404,content=f"dataset {name} not found")
+        return Response(content=dataset.getJson(),media_type="application/json")
+
+    @classmethod
+    def addRoute(cls):
+        '''
+        add the route serving the datasets to the justpy app - in front of the
+        other routes so that catch-all routes of the application do not hide it
+        '''
+        if not cls.routeAdded:
+            jp.app.router.routes.insert(0,Route(cls.route_path,cls.datasetEndpoint))
+            cls.routeAdded=True
 
 class LodGrid(jp.AgGrid):
     '''
     agGrid wrapper to be loaded from list of dicts
     '''
-    
-    def __init__(self, options:dict={},**kwargs):
+    # javascript datasource of the infinite row model that forwards the block requests to the server
+    datasource_js='''{
+    getRows: function(params) {
+        window.lodGridRequests = window.lodGridRequests || {};
+        window.lodGridRequestId = (window.lodGridRequestId || 0) + 1;
+        const requestId = window.lodGridRequestId;
+        window.lodGridRequests[requestId] = params;
+        send_to_server({
+            'event_type': 'getRows',
+            'grid': 'ag-grid',
+            'id': %s,
+            'page_id': page_id,
+            'websocket_id': websocket_id,
+            'requestId': requestId,
+            'startRow': params.startRow,
+            'endRow': params.endRow,
+            'sortModel': params.sortModel,
+            'filterModel': params.filterModel
+        }, 'event');
+    }
+}'''
+
+    # javascript applying a transaction to the grid and to the cached grid definition
+    # so that the next page update does not rebuild the grid
+    transaction_js='''(function() {
+    const transaction = %s;
+    const rowIdColumn = %s;
+    const grid = cached_grid_def['g%s'];
+    if (grid && grid.api) {
+        grid.api.applyTransaction(transaction);
+    }
+    const cachedDef = cached_grid_def['%s'];
+    if (cachedDef) {
+        const def = JSON.parse(cachedDef);
+        const rowId = (row) => String(row[rowIdColumn]);
+        const removeIds = new Set((transaction.remove || []).map(rowId));
+        const updates = new Map((transaction.update || []).map(row => [rowId(row), row]));
+        let rowData = (def.rowData || []).filter(row => !removeIds.has(rowId(row)));
+        rowData = rowData.map(row => updates.has(rowId(row)) ? updates.get(rowId(row)) : row);
+        def.rowData = rowData.concat(transaction.add || []);
+        cached_grid_def['%s'] = JSON.stringify(def);
+    }
+})();'''
+
+    # javascript fetching the rows of a shared dataset once the grid is set up
+    dataset_js='''(function() {
+    const url = %s;
+    fetch(url).then(response => response.json()).then(rows => {
+        const grid = cached_grid_def['g%s'];
+        if (grid && grid.api) {
+            grid.api.setRowData(rows);
+        }
+    });
+    return url;
+})()'''
+
+    # column definitions by schema fingerprint
+    columnDefsCache={}
+
+    def __init__(self, options:dict={},dataSource:LodGridDataSource=None,blockSize:int=100,rowIdColumn:str=None,**kwargs):
         '''
         constructor
-        
+
         Args:
             grid_options(dict): AgGrid options
+            dataSource(LodGridDataSource): if set the rows are requested block by block from this data source (infinite row model)
+            blockSize(int): the number of rows per block request
+            rowIdColumn(str): the column holding the id of a row - needed for transactions
         '''
         # set up the aggrid
         lodGrid_options={
@@ -30,8 +301,347 @@ class LodGrid(jp.AgGrid):
         grid_options = {**options, **lodGrid_options}
         
         super().__init__(options=grid_options,**kwargs)
-        
-        
+        self.dataSource=None
+        if dataSource is not None:
+            self.setDataSource(dataSource, blockSize)
+        self.rowIdColumn=None
+        # the queued transaction rows by row id
+        self.pendingAdd={}
+        self.pendingUpdate={}
+        self.pendingRemove={}
+        # the pages to send the queued transaction to by page id
+        self.pendingPages={}
+        self.transactionTask=None
+        if rowIdColumn is not None:
+            self.setRowIdColumn(rowIdColumn)
+        # True if the rowData only contains json compatible values and needs no conversion when rendering
+        self.rowDataIsJson=False
+
+    @classmethod
+    def getColumnDefs(cls,fingerprint:tuple,createColumnDefs:Callable)->List[dict]:
+        '''
+        get the column definitions for the given schema fingerprint - they are
+        only created once per fingerprint
+
+        Args:
+            fingerprint(tuple): the (column,type name) tuples of the schema
+            createColumnDefs(Callable): function to create the column definitions
+
+        Returns:
+            List[dict]: a copy of the cached column definitions
+        '''
+        columnDefs=LodGrid.columnDefsCache.get(fingerprint)
+        if columnDefs is None:
+            columnDefs=createColumnDefs()
+            LodGrid.columnDefsCache[fingerprint]=columnDefs
+        return [Dict(columnDef) for columnDef in columnDefs]
+
+    @staticmethod
+    def getFilter(typeName:str,kind:str=None):
+        '''
+        get the ag-Grid filter for the given python type name or numpy dtype kind
+        '''
+        if typeName in ["int","float"] or kind in ["i","u","f"]:
+            return "agNumberColumnFilter"
+        if typeName in ["datetime","date","Timestamp"] or kind=="M":
+            return "agDateColumnFilter"
+        # use the default filter
+        return True
+
+    def load_lod(self,lod:List[dict],columnDefs:List[dict]=None):
+        '''
+        load the given list of dicts as row data without copying it
+
+        Args:
+            lod(List[dict]): the list of dicts - the column definitions are derived from the first record
+            columnDefs(List[dict]): the column definitions to use instead
+        '''
+        header=lod[0] if len(lod)>0 else {}
+        fingerprint=tuple((key,type(value).__name__) for key,value in header.items())
+        if columnDefs is None:
+            columnDefs=LodGrid.getColumnDefs(fingerprint, lambda:[{"field":key,"filter":LodGrid.getFilter(typeName)} for key,typeName in fingerprint])
+        self.options.columnDefs=columnDefs
+        self.options.rowData=lod
+        self.options.pop("datasetUrl",None)
+        # the rows are only sent unconverted if every record is strict json
+        self.rowDataIsJson=LodGrid.isJson(lod)
+
+    def load_dataset(self,name:str):
+        '''
+        show the shared dataset with the given name - the rows are not part
+        of my options but fetched by the browser from the cached json of the dataset
+
+        Args:
+            name(str): the name of the registered LodDataset
+        '''
+        dataset=LodDataset.get(name)
+        columnDefs=dataset.columnDefs
+        if columnDefs is None:
+            header=dataset.rows[0] if len(dataset.rows)>0 else {}
+            fingerprint=tuple((key,type(value).__name__) for key,value in header.items())
+            columnDefs=LodGrid.getColumnDefs(fingerprint, lambda:[{"field":key,"filter":LodGrid.getFilter(typeName)} for key,typeName in fingerprint])
+        self.options.columnDefs=columnDefs
+        self.options.rowData=[]
+        self.options.datasetUrl=LodGrid.dataset_js % (json.dumps(dataset.getUrl()),self.id)
+        if "datasetUrl" not in self.evaluate:
+            self.evaluate.append("datasetUrl")
+        self.rowDataIsJson=True
+
+    def load_dataframe(self,df,columnDefs:List[dict]=None):
+        '''
+        load the given pandas DataFrame with vectorized conversions of
+        datetimes, infinite and missing values
+
+        Args:
+            df(DataFrame): the data frame to load
+            columnDefs(List[dict]): the column definitions to use instead of the derived ones
+        '''
+        fingerprint=tuple((str(column),str(dtype)) for column,dtype in df.dtypes.items())
+        if columnDefs is None:
+            columnDefs=LodGrid.getColumnDefs(fingerprint, lambda:[{"field":str(column),"filter":LodGrid.getFilter(None,dtype.kind)} for column,dtype in df.dtypes.items()])
+        nullMask=df.isna()
+        hasNulls=nullMask.to_numpy().any()
+        frame=df
+        datetimeColumns=[column for column,dtype in df.dtypes.items() if dtype.kind=="M"]
+        if datetimeColumns:
+            frame=frame.assign(**{str(column):df[column].astype(str) for column in datetimeColumns})
+        floatColumns=[column for column,dtype in df.dtypes.items() if dtype.kind=="f"]
+        if floatColumns:
+            # infinite values are not json compatible
+            infinite=frame[floatColumns].abs().eq(float("inf"))
+            if infinite.to_numpy().any():
+                frame=frame.assign(**{str(column):frame[column].clip(-sys.float_info.max,sys.float_info.max) for column in floatColumns})
+        if hasNulls:
+            frame=frame.astype(object).where(~nullMask,None)
+        self.options.columnDefs=columnDefs
+        self.options.rowData=frame.to_dict("records")
+        self.options.pop("datasetUrl",None)
+        self.rowDataIsJson=True
+
+    @staticmethod
+    def isJson(rows:List[dict])->bool:
+        '''
+        check whether the given rows can be sent as is - NaN and infinite values
+        are not valid json and need the conversion as well as e.g. datetimes
+
+        Args:
+            rows(List[dict]): the rows to check
+
+        Returns:
+            bool: True if all rows are strict json compatible
+        '''
+        try:
+            json.dumps(rows,allow_nan=False)
+            return True
+        except (TypeError,ValueError):
+            return False
+
+    def convert_object_to_dict(self):
+        '''
+        convert object to dict without copying json compatible row data
+        '''
+        if not self.rowDataIsJson or callable(self.row_data_converter):
+            return super().convert_object_to_dict()
+        d=dict()
+        d["vue_type"]=self.vue_type
+        d["id"]=self.id
+        d["show"]=self.show
+        d["classes"]=self.classes+" "+self.theme
+        d["style"]=self.style
+        # a shallow copy is sufficient since the rows are not modified
+        d["def"]=dict(self.options)
+        d["auto_size"]=self.auto_size
+        d["events"]=self.events
+        d["html_columns"]=self.html_columns
+        d["evaluate"]=self.evaluate
+        return d
+
+    def setRowIdColumn(self,rowIdColumn:str):
+        '''
+        set the column holding the id of a row that identifies the rows of transactions
+
+        Args:
+            rowIdColumn(str): the column with the row id
+        '''
+        self.rowIdColumn=rowIdColumn
+        self.options.getRowId=f"function(params) {{ return String(params.data[{json.dumps(rowIdColumn)}]); }}"
+        # ag-Grid before v27 - like the bundled offline version - only knows getRowNodeId
+        self.options.getRowNodeId=f"function(data) {{ return String(data[{json.dumps(rowIdColumn)}]); }}"
+        for option in ["getRowId","getRowNodeId"]:
+            if option not in self.evaluate:
+                self.evaluate.append(option)
+
+    def getRowId(self,row)->str:
+        '''
+        get the id of the given row - rows to remove may also be given by their id
+        '''
+        if self.rowIdColumn is None:
+            raise Exception("transactions are only possible when the rowIdColumn is set")
+        rowId=row.get(self.rowIdColumn) if isinstance(row,dict) else row
+        return str(rowId)
+
+    async def applyTransaction(self,add:List[dict]=None,update:List[dict]=None,remove:list=None,wp:jp.WebPage=None)->dict:
+        '''
+        apply the given rows as delta to the rowData and send only the delta
+        to ag-Grid's transaction api in the browsers showing the given page
+
+        Args:
+            add(List[dict]): the rows to add
+            update(List[dict]): the rows to replace - identified by their row id
+            remove(list): the rows or row ids to remove
+            wp(jp.WebPage): the page to send the transaction to - if None only the rowData is changed
+
+        Returns:
+            dict: the transaction sent
+        '''
+        add=list(add) if add else []
+        update=list(update) if update else []
+        removeRows=[row if isinstance(row,dict) else {self.rowIdColumn:row} for row in remove] if remove else []
+        removeIds={self.getRowId(row) for row in removeRows}
+        updates={self.getRowId(row):row for row in update}
+        rowData=self.options.get("rowData",[])
+        if removeIds or updates:
+            rowData=[updates.get(self.getRowId(row),row) for row in rowData if self.getRowId(row) not in removeIds]
+        self.options.rowData=rowData+add
+        if self.rowDataIsJson:
+            self.rowDataIsJson=LodGrid.isJson(add) and LodGrid.isJson(update)
+        transaction={"add":add,"update":update,"remove":removeRows}
+        if wp is not None:
+            await self.sendTransaction(transaction, wp)
+        return transaction
+
+    async def sendTransaction(self,transaction:dict,wp:jp.WebPage):
+        '''
+        send the given transaction to ag-Grid's transaction api in the browsers showing the given page
+
+        Args:
+            transaction(dict): the transaction with the add, update and remove rows
+            wp(jp.WebPage): the page to send the transaction to
+        '''
+        transactionJson=json.dumps(transaction,default=str)
+        javascript=LodGrid.transaction_js % (transactionJson,json.dumps(self.rowIdColumn),self.id,self.id,self.id)
+        await wp.run_javascript(javascript,send=False)
+
+    def queueTransaction(self,add:List[dict]=None,update:List[dict]=None,remove:list=None,wp:jp.WebPage=None,flushInterval:float=0.1):
+        '''
+        queue the given rows and apply them as a single coalesced transaction
+        after the flush interval - a row changed several times within the
+        interval is only sent once - the transaction is sent to all pages
+        given within the interval since they all show the same rowData
+
+        Args:
+            add(List[dict]): the rows to add
+            update(List[dict]): the rows to replace - identified by their row id
+            remove(list): the rows or row ids to remove
+            wp(jp.WebPage): the page to send the transaction to
+            flushInterval(float): seconds to collect changes before sending them
+        '''
+        for row in add or []:
+            rowId=self.getRowId(row)
+            if rowId in self.pendingRemove:
+                # removed and added again within the interval
+                del self.pendingRemove[rowId]
+                self.pendingUpdate[rowId]=row
+            else:
+                self.pendingAdd[rowId]=row
+        for row in update or []:
+            rowId=self.getRowId(row)
+            if rowId in self.pendingAdd:
+                self.pendingAdd[rowId]=row
+            else:
+                self.pendingUpdate[rowId]=row
+        for row in remove or []:
+            rowId=self.getRowId(row)
+            if self.pendingAdd.pop(rowId,None) is None:
+                self.pendingUpdate.pop(rowId,None)
+                self.pendingRemove[rowId]=row
+        if wp is not None:
+            self.pendingPages[wp.page_id]=wp
+        try:
+            loop=asyncio.get_running_loop()
+        except RuntimeError:
+            # without a running event loop the transactions need to be flushed explicitly
+            return
+        if self.transactionTask is None or self.transactionTask.done():
+            self.transactionTask=loop.create_task(self.flushTransactions(delay=flushInterval))
+
+    async def flushTransactions(self,wp:jp.WebPage=None,delay:float=None)->dict:
+        '''
+        apply the queued rows as a single transaction and send it to the queued pages
+
+        Args:
+            wp(jp.WebPage): an additional page to send the transaction to
+            delay(float): seconds to wait before flushing
+
+        Returns:
+            dict: the transaction sent or None if nothing was queued
+        '''
+        if delay is not None:
+            await asyncio.sleep(delay)
+        if not (self.pendingAdd or self.pendingUpdate or self.pendingRemove):
+            return None
+        add,update,remove=self.pendingAdd.values(),self.pendingUpdate.values(),self.pendingRemove.values()
+        pages=self.pendingPages
+        self.pendingAdd,self.pendingUpdate,self.pendingRemove,self.pendingPages={},{},{},{}
+        if wp is not None:
+            pages[wp.page_id]=wp
+        transaction=await self.applyTransaction(add, update, remove)
+        for page in pages.values():
+            await self.sendTransaction(transaction, page)
+        return transaction
+
+    def setDataSource(self,dataSource:LodGridDataSource,blockSize:int=100):
+        '''
+        switch to the infinite row model where the grid requests the rows
+        block by block from the given data source instead of getting all
+        rows embedded in the options
+
+        Args:
+            dataSource(LodGridDataSource): the data source to answer the block requests
+            blockSize(int): the number of rows per block request
+        '''
+        self.dataSource=dataSource
+        self.options.rowModelType="infinite"
+        self.options.cacheBlockSize=blockSize
+        self.options.pop("rowData",None)
+        self.options.datasource=LodGrid.datasource_js % self.id
+        if "datasource" not in self.evaluate:
+            self.evaluate.append("datasource")
+        self.on("getRows",self.onGetRows)
+
+    async def getRowBlock(self,startRow:int,endRow:int,sortModel:list=None,filterModel:dict=None)->Tuple[List[dict],int]:
+        '''
+        get the given block of rows from my data source
+
+        Returns:
+            Tuple[List[dict],int]: the rows and the total number of rows or -1 if not known yet
+        '''
+        result=self.dataSource.getRows(startRow,endRow,sortModel or [],filterModel or {})
+        if inspect.isawaitable(result):
+            result=await result
+        rows,lastRow=result
+        return rows,lastRow
+
+    async def onGetRows(self,msg):
+        '''
+        answer a block request of the grid - only the requesting browser gets the rows
+        '''
+        requestId=int(msg.requestId)
+        try:
+            rows,lastRow=await self.getRowBlock(msg.startRow,msg.endRow,msg.sortModel,msg.filterModel)
+            javascript=f"""window.lodGridRequests[{requestId}].successCallback({json.dumps(rows,default=str)},{int(lastRow)});
+delete window.lodGridRequests[{requestId}];"""
+        except Exception as ex:
+            # let the grid know that the block failed instead of leaving it loading forever
+            sys.stderr.write(f"getRows {msg.startRow}-{msg.endRow} failed: {ex!r}\n")
+            javascript=f"""window.lodGridRequests[{requestId}].failCallback();
+delete window.lodGridRequests[{requestId}];"""
+        if msg.websocket:
+            await msg.websocket.send_json({"type":"run_javascript","data":javascript,"request_id":None,"send":False})
+        # the rows have been sent - no page update needed
+        return True
+
+
 class MenuButton(jp.QBtn):
     '''
     a menu button
@@ -52,6 +662,117 @@ class MenuLink(MenuButton):
         '''
         super().__init__(**kwargs,type="a",target="_blank")
         
+class HtmlTemplateParser(jp.BasicHTMLParser):
+    '''
+    a justpy html parser that records the element tree instead of creating components
+    '''
+
+    def __init__(self):
+        super().__init__(None,create_commands=False)
+        self.rootNode={"tag":None,"attrs":[],"text":None,"children":[]}
+        self.nodes=[self.rootNode]
+
+    def handle_starttag(self, tag, attrs):
+        node={"tag":tag,"attrs":attrs,"text":None,"children":[]}
+        for attrName,_value in attrs:
+            if attrName[0] in ["@",":"]:
+                raise Exception(f"event handler and evaluated attribute {attrName} are not supported in html templates")
+        self.nodes[-1]["children"].append(node)
+        self.nodes.append(node)
+        if tag in jp.BasicHTMLParser.void_elements:
+            self.handle_endtag(tag)
+            self.endtag_required=False
+        else:
+            self.endtag_required=True
+
+    def handle_endtag(self, tag):
+        self.nodes.pop()
+
+    def handle_data(self, data):
+        data=data.strip()
+        if data:
+            self.nodes[-1]["text"]=data
+
+class HtmlTemplate:
+    '''
+    html that is parsed only once and instantiated as a fresh justpy component tree
+    with its own name_dict each time - a cached alternative to jp.parse_html
+    '''
+    # the parsed templates by html string
+    templates={}
+
+    def __init__(self,html:str):
+        '''
+        constructor
+
+        Args:
+            html(str): the html of the template
+        '''
+        parser=HtmlTemplateParser()
+        parser.feed(html)
+        self.rootNode=parser.rootNode
+
+    @classmethod
+    def get(cls,html:str)->'HtmlTemplate':
+        '''
+        get the template for the given html - parsed on first use only
+        '''
+        template=cls.templates.get(html)
+        if template is None:
+            template=cls(html)
+            cls.templates[html]=template
+        return template
+
+    def createComponent(self,node:dict,nameDict:Dict)->jp.HTMLBaseComponent:
+        '''
+        create the component for the given node and its children the same way as jp.parse_html does
+        '''
+        c=jp.component_by_tag(node["tag"],node["attrs"])
+        for attrName,value in node["attrs"]:
+            attrName=attrName.replace("-","_")
+            if attrName=="id":
+                c.id=value
+                continue
+            if value is None:
+                value=True
+            setattr(c,attrName,value)
+            if attrName=="name":
+                if value not in nameDict:
+                    nameDict[value]=c
+                else:
+                    if not isinstance(nameDict[value],list):
+                        nameDict[value]=[nameDict[value]]
+                    nameDict[value].append(c)
+            if attrName=="class":
+                c.classes=value
+        if node["text"] is not None:
+            c.text=node["text"]
+        for childNode in node["children"]:
+            c.add_component(self.createComponent(childNode, nameDict))
+        return c
+
+    def create(self,**kwargs)->jp.HTMLBaseComponent:
+        '''
+        create a new component tree from the template
+
+        Args:
+            **kwargs: the arguments for the root component e.g. a=parent
+
+        Returns:
+            HTMLBaseComponent: the root component with its name_dict - the single top level element or a Div holding the top level elements
+        '''
+        nameDict=Dict()
+        children=[self.createComponent(childNode, nameDict) for childNode in self.rootNode["children"]]
+        if len(children)==1:
+            root=children[0]
+        else:
+            root=jp.Div(name="root")
+            for child in children:
+                root.add_component(child)
+        root.name_dict=nameDict
+        root.initialize(**kwargs)
+        return root
+
 class QPasswordDialog(jp.QDialog):
     '''
     a Quasar framework based password dialog
@@ -88,7 +809,7 @@ class QPasswordDialog(jp.QDialog):
         constructor
         '''
         jp.QDialog.__init__(self,**kwargs)
-        self.card=jp.parse_html(QPasswordDialog.password_dialog_html,a=self)
+        self.card=HtmlTemplate.get(QPasswordDialog.password_dialog_html).create(a=self)
         self.loginButton=self.card.name_dict["Login"]
         self.cancelButton=self.card.name_dict["Cancel"]
         self.userInput=self.card.name_dict["user"]
@@ -119,7 +840,7 @@ class QAlert(jp.QDialog):
         constructor
         '''
         jp.QDialog.__init__(self,**kwargs)
-        self.card=jp.parse_html(QAlert.alert_dialog_html,a=self)
+        self.card=HtmlTemplate.get(QAlert.alert_dialog_html).create(a=self)
         self.alertTitle=self.card.name_dict["alertTitle"]
         self.alertContent=self.card.name_dict["alertContent"]
 
@@ -159,6 +880,27 @@ class QuasarColorPalette:
     def getAllTextColors(cls):
         return [cls.getTextColor(color) for color  in cls.colorPalette()]
 
+# the palette is computed once per process
+QUASAR_COLOR_PALETTE = tuple(QuasarColorPalette.colorPalette())
+# the colors used for token labels
+TOKEN_COLORS = tuple(color for color in QUASAR_COLOR_PALETTE if '4' in color)
+
+@lru_cache(maxsize=4096)
+def getLabelColor(label:str)->str:
+    '''
+    get the color for the given token label - the color is derived from a
+    stable hash so that it is the same in all processes and after restarts
+
+    Args:
+        label(str): the label
+
+    Returns:
+        str: the color from the TOKEN_COLORS
+    '''
+    digest=hashlib.sha256(str(label).encode("utf-8")).digest()
+    colorIndex=int.from_bytes(digest[:8],"big") % len(TOKEN_COLORS)
+    return TOKEN_COLORS[colorIndex]
+
 
 class Token(jp.QDiv):
     """
@@ -197,24 +939,416 @@ class TokenSequence(jp.QDiv):
     inspired by https://github.com/tvst/st-annotated-text
     """
 
-    def __init__(self, tokens:List[Union[str,Tuple[str,str]]], colorMap:dict=None, **kwargs):
+    TEXT_CLASSES = "q-mx-xs text-center q-pa-xs"
+    MORE_CLASSES = "q-mx-xs text-center q-pa-xs text-primary cursor-pointer"
+    MORE_LABEL = "more …"
+    PREVIOUS_LABEL = "… previous"
+    # maximum product of the changed token counts that is diffed token by token on update
+    MAX_DIFF_COST = 250000
+
+    def __init__(self, tokens:List[Union[str,Tuple[str,str]]], colorMap:dict=None, renderAsHtml:bool=False, onTokenClick:Callable=None,
+        chunkSize:int=None, maxChunks:int=None, loadChunk:Callable=None, **kwargs):
+        """
+        constructor
+        Args:
+            tokens: the text parts and (label, value) tokens
+            colorMap: the color by label - derived from the label if not given
+            renderAsHtml: If True render the whole sequence as a single html string instead of a component per token
+            onTokenClick: function(index, token, msg) called when a token is clicked in renderAsHtml mode
+            chunkSize: If set only show this number of tokens at first and further chunks on demand
+            maxChunks: maximum number of chunks shown at the same time - earlier chunks are released when more are shown
+            loadChunk: function(start, size) - sync or async - that returns the next tokens when the given ones are exhausted - an empty list marks the end
+            **kwargs:
+        """
+        if loadChunk is not None and chunkSize is None:
+            raise Exception("loadChunk needs a chunkSize")
+        if renderAsHtml:
+            # the token elements get ids derived from my id to find the clicked token
+            kwargs["temp"]=False
         super(TokenSequence, self).__init__(classes="q-pr-md q-ma-lg row justify-start", **kwargs)
-        if colorMap is None:
-            colorMap={}
-            labels = {token[0] for token in tokens if isinstance(token, tuple)}
-            colors = [ color for color in QuasarColorPalette.colorPalette() if '4' in color]
-            totalColors=len(colors)
-            for i, label in enumerate(labels):
-                colorIndex = label.__hash__() % totalColors
-                colorMap[label]=colors[colorIndex]
-        for token in tokens:
-            if isinstance(token, str):
-                jp.QDiv(a=self, text=token, classes="q-mx-xs text-center q-pa-xs")
+        self.tokens=[self.normalizeToken(token) for token in tokens]
+        self.colorMap=colorMap
+        self.renderAsHtml=renderAsHtml
+        self.onTokenClick=onTokenClick
+        self.chunkSize=chunkSize
+        self.maxChunks=maxChunks
+        self.loadChunk=loadChunk
+        # True if loadChunk has no further tokens
+        self.exhausted=loadChunk is None
+        # the shown token range
+        self.windowStart=0
+        self.windowEnd=len(self.tokens) if chunkSize is None else min(len(self.tokens),chunkSize)
+        # the html or the component of each token - None if not created yet or released
+        self.tokenHtmls=[None]*len(self.tokens)
+        self.tokenComponents=[None]*len(self.tokens)
+        # the chunk navigation components - only needed when showing chunks as components
+        self.moreControl=None
+        self.previousControl=None
+        if renderAsHtml:
+            if onTokenClick is not None or chunkSize is not None:
+                self.on("click", self.onClick)
+        elif chunkSize is not None:
+            self.moreControl=jp.QDiv(text=self.MORE_LABEL, classes=self.MORE_CLASSES, click=self.onMoreClick)
+            self.previousControl=jp.QDiv(text=self.PREVIOUS_LABEL, classes=self.MORE_CLASSES, click=self.onPreviousClick)
+        self.renderWindow()
+
+    @staticmethod
+    def normalizeToken(token:Union[str,Tuple[str,str]]) -> Union[str,Tuple[str,str]]:
+        """
+        make the given token hashable e.g. a [label, value] list is converted to a tuple
+        """
+        if isinstance(token, str):
+            return token
+        return tuple(token)
+
+    def hasMore(self) -> bool:
+        """
+        check whether there are tokens after the shown ones
+        """
+        return self.windowEnd<len(self.tokens) or not self.exhausted
+
+    def renderWindow(self) -> int:
+        """
+        render the tokens of the shown range creating only the missing html or components
+        and releasing the ones outside of the range
+
+        Returns:
+            int: the number of tokens whose html or component has been created
+        """
+        created=0
+        for index in range(self.windowStart,self.windowEnd):
+            if self.renderAsHtml:
+                if self.tokenHtmls[index] is None:
+                    self.tokenHtmls[index]=self.getTokenHtml(index, self.tokens[index])
+                    created+=1
+            elif self.tokenComponents[index] is None:
+                self.tokenComponents[index]=self.createTokenComponent(self.tokens[index])
+                created+=1
+        if self.chunkSize is not None:
+            for index,component in enumerate(self.tokenComponents):
+                if component is not None and not self.windowStart<=index<self.windowEnd:
+                    component.delete()
+                    self.tokenComponents[index]=None
+            for index,tokenHtml in enumerate(self.tokenHtmls):
+                if tokenHtml is not None and not self.windowStart<=index<self.windowEnd:
+                    self.tokenHtmls[index]=None
+        if self.renderAsHtml:
+            parts=[]
+            if self.windowStart>0:
+                parts.append(f'<div id="{self.id}-previous" class="{self.MORE_CLASSES}">{html.escape(self.PREVIOUS_LABEL)}</div>')
+            parts.extend(self.tokenHtmls[self.windowStart:self.windowEnd])
+            if self.chunkSize is not None and self.hasMore():
+                parts.append(f'<div id="{self.id}-more" class="{self.MORE_CLASSES}">{html.escape(self.MORE_LABEL)}</div>')
+            self.inner_html="".join(parts)
+        else:
+            components=[]
+            if self.windowStart>0:
+                components.append(self.previousControl)
+            components.extend(self.tokenComponents[self.windowStart:self.windowEnd])
+            if self.chunkSize is not None and self.hasMore():
+                components.append(self.moreControl)
+            self.components=components
+        return created
+
+    async def loadNextChunk(self) -> int:
+        """
+        show the next chunk of tokens - loading it with the loadChunk callback if needed
+
+        Returns:
+            int: the number of tokens added to the shown range
+        """
+        if self.chunkSize is None:
+            return 0
+        if self.windowEnd+self.chunkSize>len(self.tokens) and not self.exhausted:
+            newTokens=self.loadChunk(len(self.tokens),self.chunkSize)
+            if inspect.isawaitable(newTokens):
+                newTokens=await newTokens
+            if not newTokens:
+                self.exhausted=True
             else:
-                label, value = token
-                Token(label, value, color=colorMap.get(label),a=self)
+                self.tokens.extend(self.normalizeToken(token) for token in newTokens)
+                self.tokenHtmls.extend([None]*len(newTokens))
+                self.tokenComponents.extend([None]*len(newTokens))
+        oldEnd=self.windowEnd
+        self.windowEnd=min(len(self.tokens),self.windowEnd+self.chunkSize)
+        if self.maxChunks is not None:
+            self.windowStart=max(self.windowStart,self.windowEnd-self.maxChunks*self.chunkSize)
+        self.renderWindow()
+        return self.windowEnd-oldEnd
+
+    def loadPreviousChunk(self) -> int:
+        """
+        show the chunk before the shown range again
+
+        Returns:
+            int: the number of tokens added to the shown range
+        """
+        if self.chunkSize is None or self.windowStart==0:
+            return 0
+        oldStart=self.windowStart
+        self.windowStart=max(0,self.windowStart-self.chunkSize)
+        if self.maxChunks is not None:
+            self.windowEnd=min(self.windowEnd,self.windowStart+self.maxChunks*self.chunkSize)
+        self.renderWindow()
+        return oldStart-self.windowStart
+
+    async def onMoreClick(self, _msg):
+        await self.loadNextChunk()
 
-class HideShow(jp.Div):
+    def onPreviousClick(self, _msg):
+        self.loadPreviousChunk()
+
+    @classmethod
+    def getOpcodes(cls, oldTokens:list, newTokens:list) -> list:
+        """
+        get the difflib opcodes to turn the old tokens into the new ones
+
+        the common prefix and suffix are stripped in a linear pass so that only
+        the changed middle part is diffed - a middle part that is too large
+        for a diff is replaced as a whole
+
+        Args:
+            oldTokens: the current tokens
+            newTokens: the new tokens
+
+        Returns:
+            list: (tag, i1, i2, j1, j2) tuples as returned by SequenceMatcher.get_opcodes
+        """
+        oldLen, newLen=len(oldTokens), len(newTokens)
+        prefix=0
+        maxPrefix=min(oldLen, newLen)
+        while prefix<maxPrefix and oldTokens[prefix]==newTokens[prefix]:
+            prefix+=1
+        suffix=0
+        maxSuffix=maxPrefix-prefix
+        while suffix<maxSuffix and oldTokens[oldLen-suffix-1]==newTokens[newLen-suffix-1]:
+            suffix+=1
+        oldEnd, newEnd=oldLen-suffix, newLen-suffix
+        opcodes=[]
+        if prefix>0:
+            opcodes.append(("equal", 0, prefix, 0, prefix))
+        oldMiddle, newMiddle=oldTokens[prefix:oldEnd], newTokens[prefix:newEnd]
+        if not oldMiddle and not newMiddle:
+            pass
+        elif not oldMiddle:
+            opcodes.append(("insert", prefix, prefix, prefix, newEnd))
+        elif not newMiddle:
+            opcodes.append(("delete", prefix, oldEnd, prefix, prefix))
+        elif len(oldMiddle)*len(newMiddle)>cls.MAX_DIFF_COST:
+            opcodes.append(("replace", prefix, oldEnd, prefix, newEnd))
+        else:
+            matcher=difflib.SequenceMatcher(a=oldMiddle, b=newMiddle, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                opcodes.append((tag, i1+prefix, i2+prefix, j1+prefix, j2+prefix))
+        if suffix>0:
+            opcodes.append(("equal", oldEnd, oldLen, newEnd, newLen))
+        return opcodes
+
+    def update(self, tokens:List[Union[str,Tuple[str,str]]]) -> int:
+        """
+        update the sequence to the given tokens - only the components of the
+        tokens that have been added, removed or replaced are changed
+
+        Args:
+            tokens: the new text parts and (label, value) tokens
+
+        Returns:
+            int: the number of tokens that have been added or replaced
+        """
+        newTokens=[self.normalizeToken(token) for token in tokens]
+        changed=0
+        tokenHtmls=[]
+        tokenComponents=[]
+        for tag, i1, i2, j1, j2 in self.getOpcodes(self.tokens, newTokens):
+            if tag=="equal":
+                tokenComponents.extend(self.tokenComponents[i1:i2])
+                if i1==j1:
+                    tokenHtmls.extend(self.tokenHtmls[i1:i2])
+                else:
+                    # the html contains the token index so moved tokens are rendered again
+                    tokenHtmls.extend([None]*(j2-j1))
+            else:
+                for component in self.tokenComponents[i1:i2]:
+                    if component is not None:
+                        component.delete()
+                tokenComponents.extend([None]*(j2-j1))
+                tokenHtmls.extend([None]*(j2-j1))
+                changed+=j2-j1
+        self.tokens=newTokens
+        self.tokenHtmls=tokenHtmls
+        self.tokenComponents=tokenComponents
+        if self.chunkSize is None:
+            self.windowEnd=len(newTokens)
+        else:
+            self.windowStart=min(self.windowStart,len(newTokens))
+            self.windowEnd=min(len(newTokens),max(self.windowEnd,self.windowStart+self.chunkSize))
+        self.renderWindow()
+        return changed
+
+    def delete(self):
+        """
+        free my components including the chunk navigation controls that are currently not shown
+        """
+        for control in [self.moreControl, self.previousControl]:
+            if control is not None and control not in self.components:
+                control.delete()
+        super().delete()
+
+    def getColor(self, label:str) -> str:
+        """
+        get the color for the given label
+        """
+        return self.colorMap.get(label) if self.colorMap is not None else getLabelColor(label)
+
+    def createTokenComponent(self, token:Union[str,Tuple[str,str]]) -> jp.QDiv:
+        """
+        create the component for the given token
+        """
+        if isinstance(token, str):
+            component=jp.QDiv(text=token, classes=self.TEXT_CLASSES)
+        else:
+            label, value = token
+            component=Token(label, value, color=self.getColor(label))
+        return component
+
+    def getTokenHtml(self, index:int, token:Union[str,Tuple[str,str]]) -> str:
+        """
+        get the html for the given token with the same structure and classes as its components
+        all elements get an id with the token index to delegate clicks
+        """
+        tokenId=f"{self.id}-{index}"
+        if isinstance(token, str):
+            return f'<div id="{tokenId}" class="{self.TEXT_CLASSES}">{html.escape(token)}</div>'
+        label, value = token
+        color = self.getColor(label)
+        if color is None:
+            color = "primary"
+        tokenHtml=(f'<div id="{tokenId}" class="{Token.TOKEN_CLASSES} bg-{color}">'
+            f'<div id="{tokenId}-1" class="{Token.TOKEN_VALUE_CLASSES}"><div id="{tokenId}-2" class="col">{html.escape(str(value))}</div></div>'
+            f'<div id="{tokenId}-3" class="{Token.TOKEN_LABEL_CLASSES}"><div id="{tokenId}-4" class="col">{html.escape(str(label))}</div></div>'
+            '</div>')
+        return tokenHtml
+
+    def getTokenIndex(self, elementId) -> int:
+        """
+        get the index of the token for the given html element id
+
+        Returns:
+            int: the index or None if the element is not part of a token
+        """
+        parts=str(elementId).split("-")
+        if len(parts)>=2 and parts[0]==str(self.id) and parts[1].isdigit():
+            index=int(parts[1])
+            if index<len(self.tokens):
+                return index
+        return None
+
+    async def onClick(self, msg):
+        """
+        delegate a click on the html of the sequence to the onTokenClick handler
+        or to the chunk navigation
+        """
+        if msg.event_target==f"{self.id}-more":
+            await self.loadNextChunk()
+        elif msg.event_target==f"{self.id}-previous":
+            self.loadPreviousChunk()
+        else:
+            index=self.getTokenIndex(msg.event_target)
+            if index is not None and self.onTokenClick is not None:
+                result=self.onTokenClick(index, self.tokens[index], msg)
+                if inspect.isawaitable(result):
+                    result=await result
+                return result
+
+class LazyContent:
+    """
+    mixin for a component whose content is created by a sync or async factory
+    only when it is shown the first time and that may be discarded on hide
+    """
+
+    def setupLazyContent(self, container:jp.Div, contentFactory:Callable=None, discardOnHide:bool=False):
+        """
+        set up the lazy content
+
+        Args:
+            container: the component the content is added to
+            contentFactory: function(a) - sync or async - that adds the content to the given container
+            discardOnHide: If True delete the content on hide - it is created again on the next show
+        """
+        self.lazyContainer=container
+        self.contentFactory=contentFactory
+        self.discardOnHide=discardOnHide
+        self.contentLoaded=False
+        # the components the contentFactory added - other children of the container are kept on discard
+        self.lazyComponents=[]
+        # the awaitable of an async contentFactory called outside of an event handler
+        self.pendingContent=None
+
+    def updateLazyContent(self, shown:bool):
+        """
+        create the content when it is shown the first time or discard it on hide
+
+        Args:
+            shown: True if the content is shown now
+
+        Returns:
+            the awaitable of an async contentFactory or None
+        """
+        if shown:
+            if not self.contentLoaded and self.contentFactory is not None:
+                self.contentLoaded=True
+                before=set(id(component) for component in self.lazyContainer.components)
+                result=self.contentFactory(self.lazyContainer)
+                if inspect.isawaitable(result):
+                    return self.trackLazyContent(before, result)
+                self.addLazyComponents(before)
+        elif self.discardOnHide and self.contentLoaded:
+            self.discardLazyContent()
+            self.contentLoaded=False
+        return None
+
+    async def trackLazyContent(self, before:set, pending):
+        """
+        await the content of an async contentFactory and remember the components it added
+
+        Args:
+            before: the ids of the components of the container before the contentFactory was called
+            pending: the awaitable of the contentFactory
+        """
+        await pending
+        self.addLazyComponents(before)
+        if not self.contentLoaded:
+            # hidden and discarded while the content was still being created
+            self.discardLazyContent()
+
+    def addLazyComponents(self, before:set):
+        """
+        remember the components of the container that are not in the given set of ids
+        """
+        self.lazyComponents.extend(component for component in self.lazyContainer.components if id(component) not in before)
+
+    def discardLazyContent(self):
+        """
+        delete the components created by the contentFactory
+        """
+        for component in self.lazyComponents:
+            if component in self.lazyContainer.components:
+                self.lazyContainer.remove_component(component)
+            component.delete()
+        self.lazyComponents=[]
+
+    async def load(self):
+        """
+        create the content of an async contentFactory that has been called outside
+        of an event handler e.g. when the content is shown initially - needs
+        to be awaited before the page is sent
+        """
+        pending=self.pendingContent
+        self.pendingContent=None
+        if pending is not None:
+            await pending
+
+class HideShow(jp.Div, LazyContent):
     """
     Create a Div with visibility (hid/show) toogle 
     """
@@ -225,6 +1359,8 @@ class HideShow(jp.Div):
         self,
         hide_show_label: tuple,
         show_content: bool = True,
+        content_factory: Callable = None,
+        discard_on_hide: bool = False,
         **kwargs):
         """
         constructor
@@ -233,6 +1369,8 @@ class HideShow(jp.Div):
             content: justpy component with the content to hide/show
             hide_show_label: labels to be shown if the content is hidden/shown.       
             show_content: If True show the content at page load otherwise the content is hidden.
+            content_factory: function(a) - sync or async - that adds the content to the given container - only called when the content is shown the first time - await load() if an async content is shown initially
+            discard_on_hide: If True delete the content created by the content_factory on hide - it is created again on the next show
             **kwargs: additional justpy arguments
         """
         # first add the hide/show button to my parent
@@ -241,14 +1379,20 @@ class HideShow(jp.Div):
         self.btn = jp.Button(a=a, text=self._getStatusLabel(show_content), on_click=self.toggleHideShow)
         # then create a div component
         jp.Div.__init__(self,**kwargs)
-        self._setShowContent(show_content)
+        self.setupLazyContent(self, content_factory, discard_on_hide)
+        self.pendingContent=self._setShowContent(show_content)
         
     def _setShowContent(self,show_content:bool):
         """
         set my show_content state via my data container
+        and create or discard the lazy content accordingly
+
+        Returns:
+            the awaitable of an async content_factory or None
         """
         self.data["show_content"]=show_content
         self.hidden(not show_content)
+        return self.updateLazyContent(show_content)
 
     def _getStatusLabel(self,show_content:bool) -> str:
         """
@@ -262,10 +1406,13 @@ class HideShow(jp.Div):
             label = self.label_if_hidden if self.label_if_hidden is not None else self.label_if_shown
         return f"{label} {icon}"      
 
-    def toggleHideShow(self, _msg:dict):
+    async def toggleHideShow(self, _msg:dict):
         """
         Toggle the visibility status of the content
         """
+        await self.load()
         show_content = not self.data["show_content"]
-        self._setShowContent(show_content)
-        self.btn.text = self._getStatusLabel(show_content)
\ No newline at end of file
+        pending=self._setShowContent(show_content)
+        self.btn.text = self._getStatusLabel(show_content)
+        if pending is not None:
+            await pending
\ No newline at end of file
@@ -0,0 +1,123 @@
+'''
+Created on 2026-10-18
+
+@author: wf
+'''
+import gc
+import unittest
+from jpwidgets.columnarLod import ColumnarLod
+from jpwidgets.jpTable import Table
+from tests.basetest import BaseTest
+try:
+    import numpy as np
+    import pandas as pd
+    _has_pandas = True
+except ImportError:
+    _has_pandas = False
+
+class TestColumnarLod(BaseTest):
+    '''
+    test the columnar list of dicts
+    '''
+
+    def testColumnarLod(self):
+        '''
+        test the list of dicts view on plain lists
+        '''
+        lod=ColumnarLod({"id":[1,2,3],"name":["a","b","c"]})
+        self.assertEqual(3,len(lod))
+        self.assertEqual(["id","name"],lod.keys())
+        self.assertEqual({"id":2,"name":"b"},dict(lod[1]))
+        self.assertIs(lod[1],lod[1])
+        self.assertEqual([3],[record["id"] for record in lod[2:]])
+        lod[-1]["name"]="C"
+        self.assertEqual("C",lod.columns["name"][2])
+        with self.assertRaises(KeyError):
+            lod[0]["unknown"]="x"
+        with self.assertRaises(Exception):
+            ColumnarLod({"id":[1,2],"name":["a"]})
+
+    @unittest.skipUnless(_has_pandas, "pandas not installed")
+    def testTableFromDataFrame(self):
+        '''
+        test a virtual table on a pandas DataFrame
+        '''
+        rows=10000
+        df=pd.DataFrame({"id":np.arange(rows),"value":np.arange(rows)*0.5,"label":[f"row {i}" for i in range(rows)]})
+        lod=ColumnarLod.fromDataFrame(df)
+        table=Table(lod=lod,primaryKey="id",windowSize=20,overscan=0)
+        self.assertEqual(20,len(table.rows))
+        self.assertIsInstance(table.getCellValue(3,"id"),int)
+        self.assertEqual(1.5,table.getCellValue(3,"value"))
+        table.updateCell(5000,"value",99999.0)
+        self.assertEqual(99999.0,lod.columns["value"][5000])
+        # the data frame stays unchanged for columns of any dtype
+        table.updateCell(5000,"label","changed")
+        self.assertEqual("changed",table.getCellValue(5000,"label"))
+        self.assertEqual("row 5000",df.loc[5000,"label"])
+        self.assertEqual(2500.0,df.loc[5000,"value"])
+        # only the visible records need a row component
+        self.assertEqual(20,len(table.tbody.components))
+        # sorting uses a vectorized sort
+        self.assertEqual(5000,lod.argsort("value")[-1])
+        table.sortBy("value",descending=True)
+        self.assertEqual(5000,table.rows[0].record["id"])
+        # only the records of the shown rows exist - the sorted view is lazy
+        # and the records of the rows that left the window are freed
+        gc.collect()
+        self.assertEqual(20,len(lod.records))
+        self.assertEqual(99999.0,table.getCellValue(5000,"value"))
+        # the rows of a read-only source can not be changed
+        with self.assertRaises(Exception) as context:
+            table.appendRows([{"id":rows,"value":0.0,"label":"new"}])
+        self.assertIn("read-only",str(context.exception))
+        for action in [lambda:table.removeRow(1),lambda:table.moveRow(1,0),lambda:table.insertRow(0,{"id":-1})]:
+            with self.assertRaises(Exception):
+                action()
+        self.assertEqual(rows,len(lod))
+
+    def testKeyMap(self):
+        '''
+        test looking up records by the values of a key column
+        '''
+        lod=ColumnarLod({"id":[10,20,30],"name":["a","b","c"]})
+        keyMap=lod.getKeyMap("id")
+        self.assertEqual("b",keyMap[20]["name"])
+        self.assertIn(30,keyMap)
+        self.assertEqual([10,20,30],list(keyMap))
+        record=keyMap.pop(10)
+        keyMap[11]=record
+        self.assertIs(record,keyMap[11])
+        self.assertNotIn(10,keyMap)
+        view=lod.take([2,0,1])
+        self.assertEqual(["c","a","b"],[record["name"] for record in view])
+        self.assertEqual(["b","a","c"],[record["name"] for record in view.reversed()])
+        self.assertEqual(["a","b"],[record["name"] for record in view[1:]])
+
+    @unittest.skipUnless(_has_pandas, "pandas not installed")
+    def testVectorizedFilter(self):
+        '''
+        test that the vectorized filter matches the record by record filter
+        '''
+        rows=1000
+        df=pd.DataFrame({
+            "id":np.arange(rows),
+            "value":np.arange(rows)*0.25,
+            "label":[None if i%7==0 else f"Row {i}" for i in range(rows)],
+            "flag":[i%2==0 for i in range(rows)]
+        })
+        lod=ColumnarLod.fromDataFrame(df)
+        table=Table(lod=lod,primaryKey="id",windowSize=10,allowInput=False)
+        for filters in [{"label":"row 1"},{"value":".5"},{"flag":"tr","id":"3"},{"label":"none"},{"unknown":"x"}]:
+            table.filters=filters
+            expected=[record["id"] for record in lod if table.matchesFilters(record)]
+            view=lod.filter(filters)
+            self.assertIsNotNone(view)
+            self.assertEqual(expected,[record["id"] for record in view])
+        table.filters={}
+        # the view keeps the sort order
+        table.sortBy("value",descending=True)
+        table.setFilter("label","row 99")
+        self.assertEqual([999,998,997,996,995,993,992,991,990,99],[record["id"] for record in table.viewRecords])
+        gc.collect()
+        self.assertTrue(len(lod.records)<=20)
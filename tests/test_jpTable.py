@@ -0,0 +1,659 @@
+'''
+Created on 2026-10-18
+
+@author: wf
+'''
+import asyncio
+from datetime import datetime
+import json
+import justpy as jp
+from addict import Dict
+from jpwidgets.jpTable import ChangeSinkInterface, ColumnType, Table, TableData, UniqueKeyViolation
+from tests.basetest import BaseTest
+
+class RecordingWebSocket:
+    '''
+    a websocket stand-in that records the messages sent to the browser
+    '''
+
+    def __init__(self,wp:jp.WebPage):
+        self.messages=[]
+        jp.WebPage.sockets[wp.page_id]={id(self):self}
+
+    async def send_json(self,msg:dict):
+        self.messages.append(msg)
+
+class RecordingChangeSink(ChangeSinkInterface):
+    '''
+    a change sink that records the written batches
+    '''
+
+    def __init__(self):
+        self.batches=[]
+
+    async def writeChanges(self,changes):
+        self.batches.append(changes)
+
+class SlowChangeSink(RecordingChangeSink):
+    '''
+    a change sink that needs some time to write a batch
+    '''
+
+    def __init__(self,delay:float):
+        super().__init__()
+        self.delay=delay
+
+    async def writeChanges(self,changes):
+        await asyncio.sleep(self.delay)
+        self.batches.append(changes)
+
+class TestJpTable(BaseTest):
+    '''
+    test the jpTable widget
+    '''
+
+    def getLod(self,rows:int=100,cols:int=3)->list:
+        '''
+        get a list of dicts with the given number of rows and columns
+        '''
+        lod=[]
+        for i in range(rows):
+            record={"id":i}
+            for col in range(cols):
+                record[f"col{col}"]=f"{i}-{col}"
+            lod.append(record)
+        return lod
+
+    def testTable(self):
+        '''
+        test a plain table with all rows materialized
+        '''
+        lod=self.getLod(rows=10)
+        for allowInput in [True,False]:
+            table=Table(lod=lod,primaryKey="id",allowInput=allowInput)
+            self.assertEqual(10,len(table.rows))
+            table.updateCell(3, "col1", "changed")
+            self.assertEqual("changed",table.getCellValue(3, "col1"))
+            self.assertEqual("changed",lod[3]["col1"])
+
+    def testVirtualTable(self):
+        '''
+        test the virtual scrolling mode
+        '''
+        lod=self.getLod(rows=1000)
+        table=Table(lod=lod,primaryKey="id",windowSize=20,overscan=5)
+        self.assertTrue(table.isVirtual())
+        # only the window and the overscan after it are materialized
+        self.assertEqual(25,len(table.rows))
+        self.assertEqual(25,len(table.tbody.components))
+        table.scrollTo(500)
+        self.assertEqual((495,525),table.getWindow())
+        self.assertEqual(30,len(table.rows))
+        self.assertEqual(495,table.rows[0].record["id"])
+        # rows still in the window are reused
+        row510=table.rowsByKey[510]
+        table.scrollTo(502)
+        self.assertIs(row510,table.rowsByKey[510])
+        # scrolling is limited to the end of the table
+        table.scrollTo(5000)
+        self.assertEqual(980,table.windowStart)
+        self.assertEqual(999,table.rows[-1].record["id"])
+        # cells of rows that are not materialized may be updated and read
+        table.updateCell(3, "col0", "offscreen")
+        self.assertEqual("offscreen",table.getCellValue(3, "col0"))
+        self.assertEqual("offscreen",lod[3]["col0"])
+        table.scrollTo(0)
+        self.assertEqual("offscreen",table.rowsByKey[3].getCellValue("col0"))
+
+    def testPagedTable(self):
+        '''
+        test the paginated mode with its page cache
+        '''
+        lod=self.getLod(rows=95)
+        table=Table(lod=lod,primaryKey="id",pageSize=10,pageCacheSize=2)
+        self.assertTrue(table.isPaged())
+        self.assertEqual(10,table.getPageCount())
+        self.assertEqual(10,len(table.rows))
+        self.assertEqual("page 1 of 10",table.pageLabel.text)
+        firstPageRows=table.rows
+        table.showPage(1)
+        self.assertEqual(10,table.rows[0].record["id"])
+        # the recently viewed first page is reused
+        table.showPage(0)
+        self.assertIs(firstPageRows[0],table.rows[0])
+        # cached pages are kept up to date
+        table.updateCell(15, "col0", "cached")
+        table.showPage(1)
+        self.assertEqual("cached",table.rowsByKey[15].getCellValue("col0"))
+        # the least recently used page is evicted
+        table.showPage(9)
+        self.assertEqual(5,len(table.rows))
+        self.assertEqual([1,9],list(table.pageCache.keys()))
+        table.showPage(0)
+        self.assertIsNot(firstPageRows[0],table.rows[0])
+        self.assertEqual("page 1 of 10",table.pageLabel.text)
+
+    def testDeletePagedTable(self):
+        '''
+        test that deleting a paged table frees the rows of all cached pages
+        '''
+        lod=self.getLod(rows=100)
+        for lazyInput in [False,True]:
+            instances=len(jp.JustpyBaseComponent.instances)
+            table=Table(lod=lod,primaryKey="id",pageSize=10,lazyInput=lazyInput)
+            for pageIndex in range(5):
+                table.showPage(pageIndex)
+            if lazyInput:
+                table.rowsByKey[1].startEdit("col1")
+            table.delete()
+            self.assertEqual(instances,len(jp.JustpyBaseComponent.instances))
+        
+    def testRemoveFromLastPage(self):
+        '''
+        test removing the only row of the last page
+        '''
+        lod=self.getLod(rows=7)
+        table=Table(lod=lod,primaryKey="id",pageSize=6)
+        table.showPage(1)
+        removedRow=table.rows[0]
+        table.removeRow(6)
+        self.assertEqual(0,table.pageIndex)
+        self.assertEqual("page 1 of 1",table.pageLabel.text)
+        self.assertEqual(list(range(6)),[row.record["id"] for row in table.rows])
+        self.assertNotIn(removedRow,table.tbody.components)
+        self.assertEqual(table.rows,table.tbody.components)
+        
+    def testUpdateCells(self):
+        '''
+        test batched cell updates
+        '''
+        lod=self.getLod(rows=50)
+        wp=jp.WebPage()
+        websocket=RecordingWebSocket(wp)
+        table=Table(lod=lod,primaryKey="id",allowInput=False,windowSize=10,a=wp)
+        cells=[(key,"col0",f"{key}-0") for key in range(50)]
+        cells.extend([(2,"col1","new"),(42,"col2","new")])
+        changedKeys=asyncio.run(table.updateCells(cells,wp))
+        self.assertEqual({2,42},changedKeys)
+        # only the changed cell of the materialized row 2 is sent
+        self.assertEqual(1,len(websocket.messages))
+        self.assertEqual("component_update",websocket.messages[0]["type"])
+        self.assertEqual("new",websocket.messages[0]["data"]["inner_html"])
+        self.assertEqual("new",table.getCellValue(2,"col1"))
+        self.assertEqual("new",lod[42]["col2"])
+        changedKeys=asyncio.run(table.updateRows({3:{"col0":"3-0","col1":"x"},4:{"col1":"4-1"}},wp))
+        self.assertEqual({3},changedKeys)
+        self.assertEqual(2,len(websocket.messages))
+        # no update is pushed if nothing changed
+        asyncio.run(table.updateRows({3:{"col1":"x"}},wp))
+        self.assertEqual(2,len(websocket.messages))
+        # a large batch results in a single message
+        table=Table(lod=self.getLod(rows=200,cols=10),primaryKey="id",allowInput=False,a=wp)
+        websocket.messages=[]
+        cells=[(key,f"col{col}","changed") for key in range(200) for col in range(10)]
+        changedKeys=asyncio.run(table.updateCells(cells,wp))
+        self.assertEqual(200,len(changedKeys))
+        self.assertEqual(1,len(websocket.messages))
+
+    def testDirtyTracking(self):
+        '''
+        test the tracking of changed cells
+        '''
+        lod=self.getLod(rows=20)
+        wp=jp.WebPage()
+        websocket=RecordingWebSocket(wp)
+        for allowInput in [True,False]:
+            table=Table(lod=lod,primaryKey="id",allowInput=allowInput,a=wp)
+            self.assertEqual([],table.getDelta())
+            table.updateCell(5,"col1","five")
+            table.rowsByKey[7].getCell("col2").setValue("seven")
+            self.assertEqual([(5,"col1","five"),(7,"col2","seven")],table.getDelta())
+            websocket.messages=[]
+            pushed=asyncio.run(table.pushChanges(wp))
+            self.assertEqual(2,pushed)
+            self.assertEqual([],table.getDelta())
+            cellIds=[msg["data"]["id"] for msg in websocket.messages]
+            self.assertEqual([table.rowsByKey[5].getCell("col1").id,table.rowsByKey[7].getCell("col2").id],cellIds)
+        # direct changes of the inner html are tracked as well
+        table.rowsByKey[1].getCell("col0").inner_html="<b>1</b>"
+        self.assertEqual(1,len(table.dirtyCells))
+        # a large batch is pushed as a single update of the table body
+        table.clearDirty()
+        for key in range(20):
+            table.updateCell(key,"col2",f"batch{key}")
+        websocket.messages=[]
+        pushed=asyncio.run(table.pushChanges(wp))
+        self.assertEqual(20,pushed)
+        self.assertEqual([table.tbody.id],[msg["data"]["id"] for msg in websocket.messages])
+
+    def testDirtyCleanup(self):
+        '''
+        test that the changes are forgotten for deleted rows and on full page updates
+        '''
+        lod=self.getLod(rows=100)
+        table=Table(lod=lod,primaryKey="id",allowInput=False,windowSize=10,overscan=0)
+        for start in range(0,100,10):
+            table.scrollTo(start)
+            for tableRow in table.rows:
+                tableRow.updateCell("col1","changed")
+        # only the cells of the materialized rows are kept
+        self.assertEqual(10,len(table.dirtyCells))
+        wp=jp.WebPage()
+        wp.add(table)
+        wp.build_list()
+        self.assertEqual([],table.getDelta())
+        table=Table(lod=lod,primaryKey="id",allowInput=False,trackChanges=False)
+        table.updateCell(1,"col1","untracked")
+        self.assertEqual([],table.getDelta())
+        
+    def testRenderAsHtml(self):
+        '''
+        test the read-only html rendering path
+        '''
+        lod=self.getLod(rows=30)
+        lod[0]["col0"]="<script>alert('x')</script>"
+        lod[1]["col1"]="<a href='https://example.com'>link</a>"
+        wp=jp.WebPage()
+        websocket=RecordingWebSocket(wp)
+        table=Table(lod=lod,primaryKey="id",allowInput=False,renderAsHtml=True,htmlColumns=["col1"],windowSize=10,overscan=0,a=wp)
+        self.assertEqual(0,len(table.rows))
+        self.assertEqual(0,len(table.tbody.components))
+        tbodyHtml=table.tbody.inner_html
+        self.assertEqual(10,tbodyHtml.count("<tr>"))
+        self.assertIn("&lt;script&gt;",tbodyHtml)
+        self.assertIn("<a href='https://example.com'>link</a>",tbodyHtml)
+        row2Html=table.rowHtmlCache[id(lod[2])]
+        table.updateCell(3,"col2","<i>changed</i>")
+        table.updateCell(25,"col2","offscreen")
+        self.assertEqual([(3,"col2","<i>changed</i>"),(25,"col2","offscreen")],table.getDelta())
+        pushed=asyncio.run(table.pushChanges(wp))
+        self.assertEqual(1,pushed)
+        self.assertEqual(1,len(websocket.messages))
+        self.assertIn("&lt;i&gt;changed&lt;/i&gt;",websocket.messages[0]["data"]["inner_html"])
+        # only the changed row is regenerated
+        self.assertIs(row2Html,table.rowHtmlCache[id(lod[2])])
+        table.scrollTo(20)
+        self.assertIn("offscreen",table.tbody.inner_html)
+        with self.assertRaises(Exception):
+            Table(lod=lod,allowInput=True,renderAsHtml=True)
+
+    def testSortAndFilter(self):
+        '''
+        test sorting and filtering
+        '''
+        lod=self.getLod(rows=20)
+        for i,record in enumerate(lod):
+            record["score"]=(i*7)%20
+        lod[5]["score"]=None
+        table=Table(lod=lod,primaryKey="id",sortable=True,filterable=True)
+        rowsById={row.record["id"]:row for row in table.rows}
+        table.sortBy("score")
+        scores=[row.record["score"] for row in table.rows]
+        self.assertEqual(sorted(score for score in scores if score is not None)+[None],scores)
+        self.assertEqual("score ▲",table.headerCells["score"].inner_html)
+        # the existing rows are reordered not rebuilt
+        for row in table.rows:
+            self.assertIs(rowsById[row.record["id"]],row)
+        table.sortBy("score",descending=True)
+        self.assertEqual(None,table.rows[0].record["score"])
+        self.assertEqual(19,table.rows[1].record["score"])
+        # the column index is maintained on updates
+        table.updateCell(0,"score",100)
+        table.sortBy("score")
+        self.assertEqual(0,table.rows[-2].record["id"])
+        table.setFilter("col0","1")
+        ids=sorted(row.record["id"] for row in table.rows)
+        self.assertEqual([1]+list(range(10,20)),ids)
+        table.setFilter("col0","")
+        table.sortBy(None)
+        self.assertEqual(list(range(20)),[row.record["id"] for row in table.rows])
+
+    def testSortPaged(self):
+        '''
+        test sorting a paged table
+        '''
+        lod=self.getLod(rows=100)
+        table=Table(lod=lod,primaryKey="id",pageSize=10,sortable=True)
+        table.showPage(9)
+        lastRow=table.rows[-1]
+        table.sortBy("id",descending=True)
+        self.assertEqual(0,table.pageIndex)
+        # the rows of cached pages are reused
+        self.assertIs(lastRow,table.rows[0])
+        self.assertEqual(99,table.rows[0].record["id"])
+        self.assertEqual([0],list(table.pageCache.keys()))
+
+    def testAppendRows(self):
+        '''
+        test appending rows
+        '''
+        lod=self.getLod(rows=25)
+        configs=[{},{"windowSize":10},{"pageSize":10},{"allowInput":False,"renderAsHtml":True},{"sortable":True}]
+        for config in configs:
+            with self.subTest(config=config):
+                table=Table(lod=[],primaryKey="id",**config)
+                self.assertIsNone(table.tbody)
+                appended=table.appendRows(lod[:12])
+                self.assertEqual(12,appended)
+                if table.sortable:
+                    table.sortBy("id",descending=True)
+                table.appendRows(lod[12:])
+                self.assertEqual(25,len(table.lod))
+                self.assertEqual("24-1",table.getCellValue(24,"col1"))
+                if table.renderAsHtml:
+                    self.assertEqual(25,table.tbody.inner_html.count("<tr>"))
+                elif table.isPaged():
+                    self.assertEqual("page 1 of 3",table.pageLabel.text)
+                    table.showPage(2)
+                    self.assertEqual(5,len(table.rows))
+                elif table.isVirtual():
+                    self.assertEqual(15,len(table.rows))
+                elif table.sortable:
+                    self.assertEqual(24,table.rows[0].record["id"])
+                else:
+                    self.assertEqual(25,len(table.rows))
+
+    def testStream(self):
+        '''
+        test streaming rows from an async generator
+        '''
+        lod=self.getLod(rows=25)
+        async def generate():
+            for record in lod:
+                if record["id"]==5:
+                    # a slow source
+                    await asyncio.sleep(0.1)
+                yield record
+        wp=jp.WebPage()
+        websocket=RecordingWebSocket(wp)
+        table=Table(lod=[],primaryKey="id",a=wp)
+        total=asyncio.run(table.stream(generate(),batchSize=10,flushInterval=0.05,wp=wp))
+        self.assertEqual(25,total)
+        self.assertEqual(25,len(table.rows))
+        # the first 5 records are flushed before the slow source delivers more
+        # then two full batches follow
+        self.assertEqual(3,len(websocket.messages))
+
+    def testKeyIndexes(self):
+        '''
+        test secondary lookup indexes
+        '''
+        lod=self.getLod(rows=30)
+        for record in lod:
+            record["group"]=record["id"]%3
+            record["code"]=f"c{record['id']}"
+        table=Table(lod=lod,primaryKey="id",windowSize=10,overscan=0)
+        byCode=table.addIndex("byCode","code",unique=True)
+        table.addIndex("byGroup","group")
+        table.addIndex("byGroupAndCode",["group","code"],unique=True)
+        self.assertEqual([lod[7]],table.findRecords(code="c7"))
+        self.assertEqual(10,len(table.findRecords(group=2)))
+        self.assertEqual([lod[4]],table.findRecords(group=1,code="c4"))
+        self.assertEqual([],table.findRecords(group=0,code="c4"))
+        # without an index the records are scanned
+        self.assertEqual([lod[3]],table.findRecords(col1="3-1"))
+        # only materialized rows are found as TableRows
+        self.assertEqual([0,3,6,9],[row.record["id"] for row in table.findRows(group=0)])
+        # the indexes are maintained on edits via the input controls
+        cell=table.rowsByKey[3].getCell("group")
+        TableData.on_input_change(cell.input,Dict({"value":2}))
+        self.assertEqual(11,len(table.findRecords(group=2)))
+        self.assertEqual([lod[3]],table.findRecords(group=2,code="c3"))
+        table.updateCell(20,"code","c20new")
+        self.assertEqual([],byCode.lookup(("c20",)))
+        self.assertEqual([lod[20]],table.findRecords(code="c20new"))
+        # unique index violations are rejected
+        with self.assertRaises(Exception):
+            table.updateCell(21,"code","c7")
+        self.assertEqual("c21",lod[21]["code"])
+        # appended records are indexed
+        table.appendRows([{"id":30,"col0":"","col1":"","col2":"","group":1,"code":"c30"}])
+        self.assertEqual([30],[record["id"] for record in table.findRecords(code="c30")])
+        # changes of the primary key are reflected
+        table.updateCell(30,"id",300)
+        self.assertEqual("c30",table.getCellValue(300,"code"))
+        # the primary key stays unique
+        with self.assertRaises(UniqueKeyViolation):
+            table.updateCell(300,"id",1)
+        self.assertEqual(300,lod[-1]["id"])
+        self.assertEqual("c1",table.getCellValue(1,"code"))
+        # violations by an edit are reported and the input shows the old value again
+        messages=[]
+        table.debugContainer=Dict({"addMessage":messages.append})
+        cell=table.rowsByKey[2].getCell("code")
+        # justpy sets the value of the input to the entered text before calling the handler
+        cell.input.value="c7"
+        TableData.on_input_change(cell.input,Dict({"value":"c7"}))
+        self.assertEqual("c2",lod[2]["code"])
+        self.assertEqual("c2",cell.input.value)
+        self.assertEqual(1,len(messages))
+        self.assertIn("unique index byCode",messages[0])
+        # the rows found stay in sync with incremental row changes
+        table=Table(lod=lod[:10],primaryKey="id")
+        table.addIndex("byGroup","group")
+        table.removeRow(0)
+        table.insertRow(0,{"id":40,"col0":"","col1":"","col2":"","group":0,"code":"c40"})
+        table.appendRows([{"id":41,"col0":"","col1":"","col2":"","group":0,"code":"c41"}])
+        self.assertEqual([6,9,40,41],[row.record["id"] for row in table.findRows(group=0)])
+        self.assertEqual(len(table.rows),len(table.rowsByRecordId))
+        
+    def testRemoveInsertMoveRow(self):
+        '''
+        test removing, inserting and moving rows
+        '''
+        lod=self.getLod(rows=10)
+        table=Table(lod=lod,primaryKey="id")
+        table.addIndex("byCol0","col0",unique=True)
+        record=table.removeRow(3)
+        self.assertEqual(3,record["id"])
+        self.assertEqual(9,len(table.lod))
+        self.assertEqual(9,len(table.tbody.components))
+        self.assertFalse(3 in table.rowsByKey)
+        self.assertEqual([],table.findRecords(col0="3-0"))
+        # the removed record may be inserted again
+        table.insertRow(0,record)
+        self.assertEqual(3,table.tbody.components[0].record["id"])
+        self.assertEqual([record],table.findRecords(col0="3-0"))
+        self.assertIs(table.rowsByKey[3],table.rows[0])
+        table.moveRow(3,5)
+        self.assertEqual([0,1,2,4,5,3,6,7,8,9],[record["id"] for record in table.lod])
+        self.assertEqual([row.record["id"] for row in table.rows],[row.record["id"] for row in table.tbody.components])
+        with self.assertRaises(Exception):
+            Table(lod=self.getLod(rows=3)).removeRow(0)
+        # a paged table only rerenders the affected pages
+        table=Table(lod=self.getLod(rows=50),primaryKey="id",pageSize=10)
+        firstRow=table.rows[0]
+        table.removeRow(5)
+        self.assertIs(firstRow,table.rows[0])
+        self.assertEqual(6,table.rows[5].record["id"])
+        self.assertEqual(10,len(table.rows))
+        # a sorted table keeps its order
+        table=Table(lod=self.getLod(rows=10),primaryKey="id",sortable=True)
+        table.sortBy("id",descending=True)
+        table.insertRow(0,{"id":10,"col0":"","col1":"","col2":""})
+        self.assertEqual(10,table.rows[0].record["id"])
+        table.removeRow(9)
+        self.assertEqual([10,8],[row.record["id"] for row in table.rows[:2]])
+        
+    def testLazyInput(self):
+        '''
+        test compact cells with click-to-edit input controls
+        '''
+        lod=self.getLod(rows=20,cols=5)
+        table=Table(lod=lod,primaryKey="id",lazyInput=True)
+        row=table.rowsByKey[3]
+        self.assertEqual(0,len(row.components))
+        self.assertEqual("3-1",row.getCellValue("col1"))
+        rowDict=row.convert_object_to_dict()
+        self.assertEqual(6,len(rowDict["object_props"]))
+        self.assertEqual("3-1",rowDict["object_props"][2]["inner_html"])
+        # a click on a cell creates its input control
+        row.onCellClick(Dict({"event_target":f"{row.id}-2"}))
+        cell=row.getCell("col1")
+        self.assertTrue(isinstance(cell,TableData))
+        self.assertEqual("input",row.convert_object_to_dict()["object_props"][2]["object_props"][0]["html_tag"])
+        # clicking another cell leaves the edit mode of the first one
+        otherRow=table.rowsByKey[4]
+        otherRow.onCellClick(Dict({"event_target":f"{otherRow.id}-1"}))
+        self.assertEqual({},row.editCells)
+        cell=otherRow.getCell("col0")
+        TableData.on_input_change(cell.input,Dict({"value":"changed"}))
+        self.assertEqual("changed",lod[4]["col0"])
+        self.assertEqual("changed",otherRow.getCellValue("col0"))
+        self.assertEqual({},otherRow.editCells)
+        self.assertIsNone(table.editCell)
+        # updates of compact cells are tracked by row
+        table.updateCell(5,"col2","new")
+        self.assertEqual([(5,"col2","new")],table.getDelta())
+        wp=jp.WebPage()
+        websocket=RecordingWebSocket(wp)
+        pushed=asyncio.run(table.pushChanges(wp))
+        self.assertEqual(1,pushed)
+        self.assertEqual(table.rowsByKey[5].id,websocket.messages[0]["data"]["id"])
+        
+    def testChangeJournal(self):
+        '''
+        test the change journal and the batched write back of edits
+        '''
+        lod=self.getLod(rows=10)
+        sink=RecordingChangeSink()
+        table=Table(lod=lod,primaryKey="id",changeSink=sink,flushSize=3,flushInterval=0.05)
+        def edit(key,value):
+            cell=table.rowsByKey[key].getCell("col1")
+            TableData.on_input_change(cell.input,Dict({"value":value}))
+        # without a running event loop the changes are pending until flushed
+        edit(1,"a")
+        self.assertEqual(1,len(table.pendingChanges))
+        change=table.journal[0]
+        self.assertEqual((1,"col1","1-1","a"),(change.key,change.column,change.oldValue,change.newValue))
+        flushed=asyncio.run(table.flushChanges())
+        self.assertEqual(1,flushed)
+        self.assertEqual([[change]],sink.batches)
+        # programmatic updates are not edits
+        table.updateCell(2,"col1","b")
+        self.assertEqual(1,len(table.journal))
+        async def editAsync():
+            edit(2,"b")
+            edit(3,"c")
+            # the timer flushes after the interval
+            await asyncio.sleep(0.1)
+            self.assertEqual(2,len(sink.batches[1]))
+            for key in range(4,7):
+                edit(key,"d")
+            # the size threshold flushes immediately
+            await asyncio.sleep(0)
+            self.assertEqual(3,len(sink.batches[2]))
+        asyncio.run(editAsync())
+        self.assertEqual([],table.pendingChanges)
+        self.assertEqual(6,len(table.journal))
+        
+    def testChangeSinkInterface(self):
+        '''
+        test that a sink without writeChanges does not lose the changes
+        '''
+        table=Table(lod=self.getLod(rows=3),primaryKey="id",changeSink=ChangeSinkInterface())
+        cell=table.rowsByKey[1].getCell("col1")
+        TableData.on_input_change(cell.input,Dict({"value":"x"}))
+        with self.assertRaises(NotImplementedError):
+            asyncio.run(table.flushChanges())
+        self.assertEqual(1,len(table.pendingChanges))
+        
+    def testSlowChangeSink(self):
+        '''
+        test that no edit is lost or stuck while a batch is written back
+        '''
+        lod=self.getLod(rows=10)
+        sink=SlowChangeSink(0.2)
+        table=Table(lod=lod,primaryKey="id",changeSink=sink,flushSize=3,flushInterval=0.05)
+        def edit(key,value):
+            cell=table.rowsByKey[key].getCell("col1")
+            TableData.on_input_change(cell.input,Dict({"value":value}))
+        async def editAsync():
+            for key in range(3):
+                edit(key,"a")
+            # the first batch is being written
+            await asyncio.sleep(0.05)
+            self.assertEqual([],table.pendingChanges)
+            # reaching the flushSize again must not interrupt the write
+            for key in range(3,6):
+                edit(key,"b")
+            # an edit arriving during the write is written afterwards
+            await asyncio.sleep(0.05)
+            edit(6,"c")
+            await asyncio.sleep(0.8)
+        asyncio.run(editAsync())
+        self.assertEqual([],table.pendingChanges)
+        written=[change.key for batch in sink.batches for change in batch]
+        self.assertEqual(list(range(7)),written)
+        self.assertEqual(3,len(sink.batches[0]))
+        
+    def testColumnSchema(self):
+        '''
+        test the inferred and declared column types
+        '''
+        lod=[
+            {"name":"Alice","age":31,"height":1.70,"born":datetime(1991,3,1),"member":True,"code":7},
+            {"name":"Bob","age":None,"height":2,"born":datetime(1990,5,2),"member":False,"code":8}
+        ]
+        table=Table(lod=lod,schema={"code":str})
+        schema=table.schema
+        self.assertEqual(ColumnType.TEXT,schema["name"])
+        self.assertEqual(ColumnType.INT,schema["age"])
+        self.assertEqual(ColumnType.FLOAT,schema["height"])
+        self.assertEqual(ColumnType.DATETIME,schema["born"])
+        self.assertEqual(ColumnType.BOOL,schema["member"])
+        self.assertEqual(ColumnType.TEXT,schema["code"])
+        row=table.rows[0]
+        ageInput=row.getCell("age").input
+        self.assertEqual("number",ageInput.type)
+        self.assertEqual("31",ageInput.value)
+        self.assertEqual("1991-03-01",row.getCell("born").input.value)
+        self.assertEqual("",table.rows[1].getCell("age").input.value)
+        # edits are stored typed
+        TableData.on_input_change(ageInput,Dict({"value":"32"}))
+        self.assertEqual(32,lod[0]["age"])
+        TableData.on_input_change(row.getCell("born").input,Dict({"value":"1991-04-01"}))
+        self.assertEqual(datetime(1991,4,1),lod[0]["born"])
+        TableData.on_input_change(row.getCell("member").input,Dict({"value":"no"}))
+        self.assertEqual(False,lod[0]["member"])
+        TableData.on_input_change(row.getCell("code").input,Dict({"value":"9"}))
+        self.assertEqual("9",lod[0]["code"])
+        # invalid input is rejected
+        TableData.on_input_change(ageInput,Dict({"value":"old"}))
+        self.assertEqual(32,lod[0]["age"])
+        self.assertEqual("32",ageInput.value)
+        self.assertEqual(4,len(table.journal))
+        # empty input clears typed values
+        TableData.on_input_change(ageInput,Dict({"value":""}))
+        self.assertIsNone(lod[0]["age"])
+        
+    def testExport(self):
+        '''
+        test the streaming export of the shown records
+        '''
+        lod=self.getLod(rows=25)
+        headerMap={"id":"Id","col1":"Column 1"}
+        table=Table(lod=lod,headerMap=headerMap,primaryKey="id",sortable=True,filterable=True,allowInput=False)
+        table.sortBy("id",descending=True)
+        table.setFilter("col1","2")
+        table.updateCell(21,"col1","21,1 edited")
+        chunks=list(table.exportRows("csv",chunkSize=5))
+        # header plus the 7 filtered records in chunks of 5
+        self.assertEqual(2,len(chunks))
+        lines="".join(chunks).splitlines()
+        self.assertEqual("Id,Column 1",lines[0])
+        self.assertEqual('21,"21,1 edited"',lines[4])
+        self.assertEqual("2,2-1",lines[7])
+        self.assertEqual(1+len(table.viewRecords),len(lines))
+        jsonLines="".join(table.exportRows("jsonl")).splitlines()
+        self.assertEqual({"id":24,"col1":"24-1"},json.loads(jsonLines[0]))
+        with self.assertRaises(Exception):
+            table.getExportResponse("xlsx")
+        response=table.getExportResponse("jsonl",filename="test.jsonl")
+        self.assertEqual('attachment; filename="test.jsonl"',response.headers["content-disposition"])
+        async def readBody():
+            body=""
+            async for chunk in response.body_iterator:
+                body+=chunk
+            return body
+        self.assertEqual("".join(jsonLines)+"\n","".join(asyncio.run(readBody()).splitlines())+"\n")
@@ -0,0 +1,127 @@
+'''
+Created on 2026-10-18
+
+@author: wf
+'''
+import json
+import os
+import tracemalloc
+from jpwidgets.jpTable import Table
+from tests.basetest import BaseTest, Profiler
+
+class TestJpTableBenchmark(BaseTest):
+    '''
+    benchmark the construction and render cost of jpTable
+
+    by default only 1k rows with 10 columns are measured (and 5k rows for the virtual
+    and paged tables) - set the environment variable JPTABLE_BENCHMARK=full to
+    measure 1k/10k/100k rows with 10/50 columns
+    (not in public CI since this needs several GB of memory)
+    '''
+
+    def getSizes(self,minRowCounts:int=1)->list:
+        '''
+        get the (rows,cols) sizes to benchmark
+
+        Args:
+            minRowCounts(int): the minimum number of different row counts per number of columns
+        '''
+        rowCounts=[1000,5000][:max(1,minRowCounts)]
+        colCounts=[10]
+        if os.environ.get("JPTABLE_BENCHMARK")=="full" and not self.inPublicCI():
+            rowCounts=[1000,10000,100000]
+            colCounts=[10,50]
+        sizes=[(rows,cols) for rows in rowCounts for cols in colCounts]
+        return sizes
+
+    def getLod(self,rows:int,cols:int)->list:
+        '''
+        get a list of dicts with the given number of rows and columns
+        '''
+        lod=[]
+        for i in range(rows):
+            record={"id":i}
+            for col in range(cols):
+                record[f"col{col}"]=f"{i}-{col}"
+            lod.append(record)
+        return lod
+
+    def countComponents(self,component)->int:
+        '''
+        count the justpy components of the given component tree
+        '''
+        count=1
+        children=list(getattr(component,"components",[]))
+        children.extend(getattr(component,"editCells",{}).values())
+        for child in children:
+            count+=self.countComponents(child)
+        return count
+
+    def benchmark(self,rows:int,cols:int,**tableArgs)->dict:
+        '''
+        benchmark a table of the given size
+
+        Args:
+            rows(int): number of rows
+            cols(int): number of columns
+            **tableArgs: the arguments for the Table constructor
+
+        Returns:
+            dict: the measured values
+        '''
+        lod=self.getLod(rows, cols)
+        msg=f"{rows} rows x {cols} cols {tableArgs}"
+        # tracing slows down the construction so it is measured separately
+        tracemalloc.start()
+        Table(lod=lod,primaryKey="id",**tableArgs).delete()
+        _current,peak=tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profiler=Profiler(f"constructing {msg}",profile=self.debug)
+        table=Table(lod=lod,primaryKey="id",**tableArgs)
+        constructionTime=profiler.time()
+        components=self.countComponents(table)
+        pageDict=table.convert_object_to_dict()
+        pageDictSize=len(json.dumps(pageDict,default=str))
+        updates=min(rows,10000)
+        profiler=Profiler(f"updating {updates} cells of {msg}",profile=self.debug)
+        for i in range(updates):
+            table.updateCell(i,"col1",f"{i}-changed")
+        updateTime=profiler.time()
+        # free the event handlers of the table
+        table.delete()
+        result={
+            "constructionTime":constructionTime,
+            "peakMemory":peak,
+            "components":components,
+            "pageDictSize":pageDictSize,
+            "updatesPerSecond":updates/updateTime if updateTime>0 else float("inf")
+        }
+        if self.profile:
+            print(f"{msg}: {constructionTime:5.2f} s, peak memory {peak/1024/1024:7.1f} MB, {components} components, page dict {pageDictSize/1024/1024:7.1f} MB, {result['updatesPerSecond']:9.0f} updateCell/s")
+        return result
+
+    def testTableBenchmark(self):
+        '''
+        benchmark tables with and without input controls
+        '''
+        for rows,cols in self.getSizes():
+            for tableArgs in [{"allowInput":True},{"allowInput":True,"lazyInput":True},{"allowInput":False}]:
+                result=self.benchmark(rows, cols, **tableArgs)
+                # the row components are always built - the cells only if not lazy
+                self.assertTrue(result["components"]>rows)
+                self.assertTrue(result["pageDictSize"]>0)
+
+    def testVirtualTableBenchmark(self):
+        '''
+        benchmark the render cost of virtual and paged tables which
+        should be independent of the number of rows
+        '''
+        componentsBySize={}
+        # the render cost needs to be compared for at least two row counts
+        for rows,cols in self.getSizes(minRowCounts=2):
+            for tableArgs in [{"windowSize":50},{"pageSize":50}]:
+                result=self.benchmark(rows, cols, **tableArgs)
+                componentsBySize.setdefault((cols,str(tableArgs)),{})[rows]=result["components"]
+        for componentsByRows in componentsBySize.values():
+            self.assertTrue(len(componentsByRows)>=2)
+            self.assertEqual(1,len(set(componentsByRows.values())))
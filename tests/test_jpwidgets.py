@@ -3,7 +3,31 @@ Created on 2022-05-15
 
 @author: wf
 '''
+import asyncio
+from datetime import datetime
+import json
+import unittest
+import justpy as jp
+from addict import Dict
+from jpwidgets.bt5widgets import Collapsible
+from jpwidgets.widgets import getLabelColor, HideShow, HtmlTemplate, LodDataset, LodDataSource, LodGrid, LodGridDataSource, QAlert, QPasswordDialog, Token, TokenSequence, TOKEN_COLORS
 from tests.basetest import BaseTest
+try:
+    import pandas as pd
+    _has_pandas = True
+except ImportError:
+    _has_pandas = False
+
+class RecordingWebSocket:
+    '''
+    a websocket stand-in that records the messages sent to the browser
+    '''
+
+    def __init__(self):
+        self.messages=[]
+
+    async def send_json(self,msg:dict):
+        self.messages.append(msg)
 
 class TestJpWidgets(BaseTest):
     '''
@@ -18,4 +42,429 @@ class TestJpWidgets(BaseTest):
         '''
         test the List of Dict Grid component
         '''
-    
\ No newline at end of file
+        
+    def testLodGridDataSource(self):
+        '''
+        test the infinite row model with a server side data source
+        '''
+        lod=[{"id":i,"name":f"name{i%7}"} for i in range(1000)]
+        grid=LodGrid(dataSource=LodDataSource(lod),blockSize=50)
+        gridDict=grid.convert_object_to_dict()
+        self.assertEqual("infinite",gridDict["def"]["rowModelType"])
+        self.assertFalse("rowData" in gridDict["def"])
+        self.assertTrue("datasource" in gridDict["evaluate"])
+        self.assertTrue(f"'id': {grid.id}" in gridDict["def"]["datasource"])
+        websocket=RecordingWebSocket()
+        msg=Dict({
+            "requestId":3,"startRow":50,"endRow":100,
+            "sortModel":[{"colId":"name","sort":"desc"},{"colId":"id","sort":"asc"}],
+            "filterModel":{"id":{"filterType":"number","type":"greaterThan","filter":499}}
+        })
+        msg.websocket=websocket
+        result=asyncio.run(grid.onGetRows(msg))
+        self.assertTrue(result)
+        javascript=websocket.messages[0]["data"]
+        self.assertTrue(javascript.startswith("window.lodGridRequests[3].successCallback("))
+        rowsJson=javascript[len("window.lodGridRequests[3].successCallback("):javascript.index(",500);")]
+        rows=json.loads(rowsJson)
+        self.assertEqual(50,len(rows))
+        # the 71 rows of name6 above 499 come first
+        self.assertEqual({"id":853,"name":"name6"},rows[0])
+        self.assertEqual("name5",rows[-1]["name"])
+        rows,lastRow=asyncio.run(grid.getRowBlock(0,10,filterModel={"name":{"filterType":"text","type":"equals","filter":"NAME1"}}))
+        self.assertEqual(143,lastRow)
+        self.assertEqual([1,8],[row["id"] for row in rows[:2]])
+        # combined conditions in the current and in the legacy filter model format
+        combined={"filterType":"number","operator":"OR","conditions":[
+            {"filterType":"number","type":"lessThan","filter":3},
+            {"filterType":"number","type":"greaterThan","filter":997}
+        ]}
+        rows,lastRow=asyncio.run(grid.getRowBlock(0,10,filterModel={"id":combined}))
+        self.assertEqual([0,1,2,998,999],[row["id"] for row in rows])
+        legacy={"filterType":"text","operator":"AND",
+            "condition1":{"filterType":"text","type":"startsWith","filter":"name"},
+            "condition2":{"filterType":"text","type":"endsWith","filter":"3"}
+        }
+        rows,lastRow=asyncio.run(grid.getRowBlock(0,10,filterModel={"name":legacy}))
+        self.assertEqual(143,lastRow)
+        with self.assertRaises(Exception):
+            LodDataSource.matches(1,{"operator":"XOR","conditions":[]})
+
+    def testLodGridDataSourceFailure(self):
+        '''
+        test that a failing data source lets the grid know via the failCallback
+        '''
+        class FailingDataSource(LodDataSource):
+            def getRows(self,startRow,endRow,sortModel,filterModel):
+                raise Exception("database not reachable")
+        grid=LodGrid(dataSource=FailingDataSource([]))
+        websocket=RecordingWebSocket()
+        msg=Dict({"requestId":7,"startRow":0,"endRow":100,"sortModel":[],"filterModel":{}})
+        msg.websocket=websocket
+        result=asyncio.run(grid.onGetRows(msg))
+        self.assertTrue(result)
+        javascript=websocket.messages[0]["data"]
+        self.assertTrue(javascript.startswith("window.lodGridRequests[7].failCallback();"))
+        self.assertTrue("delete window.lodGridRequests[7];" in javascript)
+        with self.assertRaises(NotImplementedError):
+            LodGridDataSource().getRows(0,10,[],{})
+
+    def testLodGridTransactions(self):
+        '''
+        test incremental row data transactions
+        '''
+        lod=[{"id":i,"value":i*10} for i in range(5)]
+        grid=LodGrid(rowIdColumn="id")
+        grid.load_lod(lod)
+        self.assertTrue("getRowId" in grid.evaluate)
+        wp=jp.WebPage()
+        websocket=RecordingWebSocket()
+        jp.WebPage.sockets[wp.page_id]={1:websocket}
+        transaction=asyncio.run(grid.applyTransaction(add=[{"id":5,"value":50}],update=[{"id":1,"value":11}],remove=[2],wp=wp))
+        self.assertEqual([{"id":2}],transaction["remove"])
+        self.assertEqual([0,1,3,4,5],[row["id"] for row in grid.options.rowData])
+        self.assertEqual(11,grid.options.rowData[1]["value"])
+        javascript=websocket.messages[0]["data"]
+        self.assertTrue(f"cached_grid_def['g{grid.id}']" in javascript)
+        self.assertTrue('"value": 50' in javascript)
+        # high frequency updates are coalesced
+        async def queue():
+            for i in range(10):
+                grid.queueTransaction(update=[{"id":3,"value":i}],wp=wp,flushInterval=0.01)
+            grid.queueTransaction(add=[{"id":6,"value":60}],wp=wp)
+            grid.queueTransaction(update=[{"id":6,"value":61}],wp=wp)
+            grid.queueTransaction(remove=[{"id":4}],wp=wp)
+            await asyncio.sleep(0.05)
+        asyncio.run(queue())
+        self.assertEqual(2,len(websocket.messages))
+        self.assertEqual([0,1,3,5,6],[row["id"] for row in grid.options.rowData])
+        self.assertEqual(9,grid.options.rowData[2]["value"])
+        self.assertEqual(61,grid.options.rowData[4]["value"])
+        # the queued transaction reaches every page given within the interval
+        otherWp=jp.WebPage()
+        otherWebsocket=RecordingWebSocket()
+        jp.WebPage.sockets[otherWp.page_id]={1:otherWebsocket}
+        async def queueForPages():
+            grid.queueTransaction(update=[{"id":0,"value":1}],wp=wp,flushInterval=0.01)
+            grid.queueTransaction(update=[{"id":1,"value":2}],wp=otherWp)
+            await asyncio.sleep(0.05)
+        asyncio.run(queueForPages())
+        self.assertEqual(3,len(websocket.messages))
+        self.assertEqual(1,len(otherWebsocket.messages))
+        self.assertEqual(websocket.messages[-1]["data"],otherWebsocket.messages[0]["data"])
+        self.assertEqual([1,2],[row["value"] for row in grid.options.rowData[:2]])
+        # the bundled offline ag-Grid version only knows getRowNodeId
+        self.assertTrue("getRowNodeId" in grid.evaluate)
+        self.assertTrue('data["id"]' in grid.options.getRowNodeId)
+        with self.assertRaises(Exception):
+            asyncio.run(LodGrid().applyTransaction(remove=[1]))
+        
+    def testLodGridLoad(self):
+        '''
+        test loading a list of dicts with cached column definitions
+        '''
+        lod=[{"name":"a","count":1},{"name":"b","count":2}]
+        grid=LodGrid()
+        grid.load_lod(lod)
+        self.assertIs(lod,grid.options.rowData)
+        self.assertEqual("agNumberColumnFilter",grid.options.columnDefs[1]["filter"])
+        gridDict=grid.convert_object_to_dict()
+        # json compatible rows are not copied
+        self.assertIs(lod,gridDict["def"]["rowData"])
+        otherGrid=LodGrid()
+        otherGrid.load_lod([{"name":"c","count":3}])
+        self.assertEqual(grid.options.columnDefs,otherGrid.options.columnDefs)
+        self.assertIsNot(grid.options.columnDefs[0],otherGrid.options.columnDefs[0])
+        # datetimes need the conversion when rendering
+        grid.load_lod([{"when":datetime(2022,5,22)}])
+        self.assertEqual("agDateColumnFilter",grid.options.columnDefs[0]["filter"])
+        self.assertFalse(grid.rowDataIsJson)
+        # all records are checked - not only the first one
+        grid.load_lod([{"name":"a","value":1.0},{"name":"b","value":datetime(2022,5,22)}])
+        self.assertFalse(grid.rowDataIsJson)
+        grid.load_lod([{"name":"a","value":1.0},{"name":"b","value":float("nan")}])
+        self.assertFalse(grid.rowDataIsJson)
+        gridDict=grid.convert_object_to_dict()
+        self.assertIsNot(grid.options.rowData,gridDict["def"]["rowData"])
+        # rows added by a transaction are checked as well
+        grid=LodGrid(rowIdColumn="name")
+        grid.load_lod([{"name":"a","value":1.0}])
+        self.assertTrue(grid.rowDataIsJson)
+        asyncio.run(grid.applyTransaction(add=[{"name":"b","value":datetime(2022,5,22)}]))
+        self.assertFalse(grid.rowDataIsJson)
+
+    @unittest.skipUnless(_has_pandas,"pandas not installed")
+    def testLodGridLoadDataFrame(self):
+        '''
+        test loading a pandas DataFrame
+        '''
+        df=pd.DataFrame({
+            "name":["a",None,"c"],
+            "value":[1.5,float("nan"),float("inf")],
+            "count":[1,2,3],
+            "when":pd.to_datetime(["2022-05-22",None,"2022-05-24 10:00"],format="mixed")
+        })
+        grid=LodGrid()
+        grid.load_dataframe(df)
+        self.assertEqual(["name","value","count","when"],[columnDef["field"] for columnDef in grid.options.columnDefs])
+        self.assertEqual("agNumberColumnFilter",grid.options.columnDefs[2]["filter"])
+        self.assertEqual("agDateColumnFilter",grid.options.columnDefs[3]["filter"])
+        rows=grid.options.rowData
+        self.assertEqual({"name":"a","value":1.5,"count":1,"when":"2022-05-22 00:00:00"},rows[0])
+        self.assertEqual({"name":None,"value":None,"count":2,"when":None},rows[1])
+        self.assertTrue(rows[2]["value"]<float("inf"))
+        json.dumps(grid.convert_object_to_dict())
+        
+    def testLodDataset(self):
+        '''
+        test sharing a read-only dataset between grids
+        '''
+        lod=[{"id":i,"name":f"name{i}"} for i in range(100)]
+        dataset=LodDataset.register("testLodDataset",lod)
+        with self.assertRaises(Exception):
+            LodDataset.register("testLodDataset",lod)
+        grids=[LodGrid() for _i in range(3)]
+        for grid in grids:
+            grid.load_dataset("testLodDataset")
+            gridDict=grid.convert_object_to_dict()
+            self.assertEqual([],gridDict["def"]["rowData"])
+            self.assertTrue(dataset.getUrl() in gridDict["def"]["datasetUrl"])
+            self.assertTrue("datasetUrl" in gridDict["evaluate"])
+        self.assertEqual("agNumberColumnFilter",grids[0].options.columnDefs[0]["filter"])
+        self.assertIs(dataset.getJson(),dataset.getJson())
+        self.assertEqual(lod,json.loads(dataset.getJson()))
+        self.assertTrue(any(getattr(route,"path",None)==LodDataset.route_path for route in jp.app.routes))
+        response=asyncio.run(LodDataset.datasetEndpoint(Dict({"path_params":{"name":"testLodDataset"}})))
+        self.assertEqual(dataset.getJson(),response.body)
+        LodDataset.unregister("testLodDataset")
+        response=asyncio.run(LodDataset.datasetEndpoint(Dict({"path_params":{"name":"testLodDataset"}})))
+        self.assertEqual(404,response.status_code)
+        with self.assertRaises(Exception):
+            grids[0].load_dataset("testLodDataset")
+        
+    def testHtmlTemplate(self):
+        '''
+        test the cached html templates of the dialogs
+        '''
+        dialogs=[QPasswordDialog() for _i in range(3)]
+        template=HtmlTemplate.get(QPasswordDialog.password_dialog_html)
+        self.assertIs(template,HtmlTemplate.get(QPasswordDialog.password_dialog_html))
+        # each dialog has its own components
+        self.assertIsNot(dialogs[0].userInput,dialogs[1].userInput)
+        self.assertEqual("password",dialogs[2].passwordInput.type)
+        self.assertIs(dialogs[0].card,dialogs[0].components[0])
+        # the component tree is the same as the one of jp.parse_html
+        def withoutIds(d):
+            if isinstance(d,dict):
+                return {key:withoutIds(value) for key,value in d.items() if key!="id"}
+            if isinstance(d,list):
+                return [withoutIds(value) for value in d]
+            return d
+        parsed=jp.parse_html(QAlert.alert_dialog_html)
+        created=HtmlTemplate.get(QAlert.alert_dialog_html).create()
+        self.assertEqual(withoutIds(parsed.convert_object_to_dict()),withoutIds(created.convert_object_to_dict()))
+        self.assertEqual(sorted(parsed.name_dict.keys()),sorted(created.name_dict.keys()))
+        alert=QAlert()
+        self.assertEqual("Alert",alert.alertTitle.text)
+        root=HtmlTemplate.get("<div name='a'>1</div><span name='a'>2</span>").create()
+        self.assertEqual(2,len(root.components))
+        self.assertEqual(2,len(root.name_dict["a"]))
+        with self.assertRaises(Exception):
+            HtmlTemplate.get("<button @click='print(1)'>x</button>")
+        
+    def testTokenColors(self):
+        '''
+        test the stable color assignment of token labels
+        '''
+        # the colors must not depend on the salted string hash of the process
+        self.assertEqual("deep-orange-4",getLabelColor("PER"))
+        self.assertEqual("teal-14",getLabelColor("ORG"))
+        self.assertTrue(getLabelColor("LOC") in TOKEN_COLORS)
+        tokens=["Angela",("PER","Merkel"),"visited",("ORG","CERN"),("PER","Macron")]
+        tokenSequence=TokenSequence(tokens)
+        tokenComponents=[c for c in tokenSequence.components if isinstance(c,Token)]
+        self.assertTrue(tokenComponents[0].classes.endswith("bg-deep-orange-4"))
+        self.assertEqual(tokenComponents[0].classes,tokenComponents[2].classes)
+        tokenSequence=TokenSequence(tokens,colorMap={"PER":"red"})
+        tokenComponents=[c for c in tokenSequence.components if isinstance(c,Token)]
+        self.assertTrue(tokenComponents[0].classes.endswith("bg-red"))
+        self.assertTrue(tokenComponents[1].classes.endswith("bg-primary"))
+        
+    def testTokenSequenceAsHtml(self):
+        '''
+        test rendering a token sequence as a single html string
+        '''
+        clicks=[]
+        tokens=["Angela <b>",("PER","Merkel"),"visited",("ORG","CERN")]
+        tokenSequence=TokenSequence(tokens,renderAsHtml=True,onTokenClick=lambda index,token,_msg:clicks.append((index,token)))
+        self.assertEqual([],tokenSequence.components)
+        tokenHtml=tokenSequence.inner_html
+        self.assertTrue("Angela &lt;b&gt;" in tokenHtml)
+        self.assertTrue(f'id="{tokenSequence.id}-1" class="{Token.TOKEN_CLASSES} bg-deep-orange-4"' in tokenHtml)
+        self.assertEqual(tokenHtml.count(Token.TOKEN_LABEL_CLASSES),2)
+        # a click on the label of the second entity
+        asyncio.run(tokenSequence.onClick(Dict({"event_target":f"{tokenSequence.id}-3-4"})))
+        asyncio.run(tokenSequence.onClick(Dict({"event_target":f"{tokenSequence.id}"})))
+        asyncio.run(tokenSequence.onClick(Dict({"event_target":f"{tokenSequence.id}-7"})))
+        self.assertEqual([(3,("ORG","CERN"))],clicks)
+        
+    def testTokenSequenceUpdate(self):
+        '''
+        test the incremental update of a token sequence
+        '''
+        tokens=["Angela",("PER","Merkel"),"visited",("ORG","CERN"),"in",("LOC","Geneva")]
+        tokenSequence=TokenSequence(tokens)
+        components=list(tokenSequence.components)
+        newTokens=["Angela",("PER","Merkel"),"visited",("ORG","CERN"),"and",("ORG","ESA"),"in",["LOC","Geneva"]]
+        created=tokenSequence.update(newTokens)
+        self.assertEqual(2,created)
+        self.assertEqual(8,len(tokenSequence.components))
+        for index in [0,1,2,3]:
+            self.assertIs(components[index],tokenSequence.components[index])
+        self.assertIs(components[5],tokenSequence.components[7])
+        self.assertEqual("ESA",tokenSequence.components[5].value)
+        created=tokenSequence.update(["Angela",("PER","Merkel")])
+        self.assertEqual(0,created)
+        self.assertEqual(2,len(tokenSequence.components))
+        # only the changed middle of a long sequence is diffed
+        longTokens=[("PER",f"Person{i}") if i%3==0 else f"word{i}" for i in range(5000)]
+        tokenSequence=TokenSequence(longTokens)
+        newTokens=list(longTokens)
+        newTokens[2500]="changed"
+        self.assertEqual(1,tokenSequence.update(newTokens))
+        self.assertEqual(5000,len(tokenSequence.components))
+        opcodes=TokenSequence.getOpcodes(longTokens,newTokens)
+        self.assertEqual([("equal",0,2500,0,2500),("replace",2500,2501,2500,2501),("equal",2501,5000,2501,5000)],opcodes)
+        # a too large middle is replaced as a whole
+        oldMiddle=[f"a{i}" for i in range(1000)]
+        newMiddle=[f"b{i}" for i in range(1000)]
+        self.assertEqual([("equal",0,1,0,1),("replace",1,1001,1,1001)],TokenSequence.getOpcodes(["x"]+oldMiddle,["x"]+newMiddle))
+        # html mode
+        tokenSequence=TokenSequence(tokens,renderAsHtml=True)
+        created=tokenSequence.update(["Hello"]+tokens)
+        self.assertEqual(1,created)
+        self.assertTrue(f'id="{tokenSequence.id}-2" class="{Token.TOKEN_CLASSES}' in tokenSequence.inner_html)
+        self.assertEqual(tokenSequence.inner_html,"".join(tokenSequence.getTokenHtml(index,token) for index,token in enumerate(tokenSequence.tokens)))
+        
+    def testTokenSequenceChunks(self):
+        '''
+        test showing only a window of a long token sequence and loading further chunks
+        '''
+        tokens=[("PER",f"Person{i}") if i%2 else f"text{i}" for i in range(10)]
+        loads=[]
+        async def loadChunk(start,size):
+            loads.append((start,size))
+            return [f"loaded{i}" for i in range(start,min(start+size,25))]
+        tokenSequence=TokenSequence(tokens,chunkSize=4,maxChunks=2,loadChunk=loadChunk)
+        self.assertEqual(5,len(tokenSequence.components))
+        self.assertIs(tokenSequence.moreControl,tokenSequence.components[-1])
+        self.assertEqual(4,sum(1 for c in tokenSequence.tokenComponents if c is not None))
+        self.assertEqual(4,asyncio.run(tokenSequence.loadNextChunk()))
+        self.assertEqual((0,8),(tokenSequence.windowStart,tokenSequence.windowEnd))
+        # the window slides and the first chunk is released
+        asyncio.run(tokenSequence.onMoreClick(None))
+        self.assertEqual((4,12),(tokenSequence.windowStart,tokenSequence.windowEnd))
+        self.assertEqual([(10,4)],loads)
+        self.assertIsNone(tokenSequence.tokenComponents[0])
+        self.assertIs(tokenSequence.previousControl,tokenSequence.components[0])
+        self.assertEqual(10,len(tokenSequence.components))
+        while tokenSequence.hasMore():
+            asyncio.run(tokenSequence.loadNextChunk())
+        self.assertEqual(25,len(tokenSequence.tokens))
+        self.assertEqual((17,25),(tokenSequence.windowStart,tokenSequence.windowEnd))
+        self.assertEqual("loaded24",tokenSequence.components[-1].text)
+        self.assertEqual(4,tokenSequence.loadPreviousChunk())
+        self.assertEqual((13,21),(tokenSequence.windowStart,tokenSequence.windowEnd))
+        # deleting frees the detached more control as well
+        instances=len(jp.JustpyBaseComponent.instances)
+        tokenSequence.delete()
+        self.assertEqual(instances-2,len(jp.JustpyBaseComponent.instances))
+        # a sequence without chunks has no chunk navigation
+        instances=len(jp.JustpyBaseComponent.instances)
+        for _i in range(10):
+            TokenSequence(tokens).delete()
+        self.assertEqual(instances,len(jp.JustpyBaseComponent.instances))
+        # html mode with the more control as part of the html
+        tokenSequence=TokenSequence(tokens,renderAsHtml=True,chunkSize=4)
+        self.assertTrue(f'id="{tokenSequence.id}-3"' in tokenSequence.inner_html)
+        self.assertFalse(f'id="{tokenSequence.id}-4"' in tokenSequence.inner_html)
+        asyncio.run(tokenSequence.onClick(Dict({"event_target":f"{tokenSequence.id}-more"})))
+        self.assertTrue(f'id="{tokenSequence.id}-7"' in tokenSequence.inner_html)
+        asyncio.run(tokenSequence.onClick(Dict({"event_target":f"{tokenSequence.id}-more"})))
+        self.assertFalse(f'id="{tokenSequence.id}-more"' in tokenSequence.inner_html)
+        
+    def testHideShowLazyContent(self):
+        '''
+        test that the content of a HideShow is only created when it is shown
+        '''
+        calls=[]
+        def createContent(a):
+            calls.append(a)
+            jp.Span(a=a,text="lazy content")
+        parent=jp.Div()
+        hideShow=HideShow(("Hide","Show"),show_content=False,content_factory=createContent,discard_on_hide=True,a=parent)
+        self.assertEqual([],calls)
+        self.assertEqual([],hideShow.components)
+        asyncio.run(hideShow.toggleHideShow(None))
+        self.assertEqual([hideShow],calls)
+        self.assertEqual(1,len(hideShow.components))
+        # discarded on hide and created again on the next show
+        asyncio.run(hideShow.toggleHideShow(None))
+        self.assertEqual([],hideShow.components)
+        asyncio.run(hideShow.toggleHideShow(None))
+        self.assertEqual(2,len(calls))
+        # children added by the caller are not part of the discarded content
+        footer=jp.Span(a=hideShow,text="footer")
+        asyncio.run(hideShow.toggleHideShow(None))
+        self.assertEqual([footer],hideShow.components)
+        asyncio.run(hideShow.toggleHideShow(None))
+        self.assertEqual(2,len(hideShow.components))
+        self.assertIs(footer,hideShow.components[0])
+        # async content factory
+        async def createContentAsync(a):
+            await asyncio.sleep(0)
+            jp.Span(a=a,text="async lazy content")
+        hideShow=HideShow(("Hide","Show"),show_content=False,content_factory=createContentAsync,a=parent)
+        asyncio.run(hideShow.toggleHideShow(None))
+        asyncio.run(hideShow.toggleHideShow(None))
+        self.assertEqual(1,len(hideShow.components))
+        # an async content that is shown initially is created by awaiting load
+        hideShow=HideShow(("Hide","Show"),content_factory=createContentAsync,a=parent)
+        self.assertEqual(0,len(hideShow.components))
+        asyncio.run(hideShow.load())
+        self.assertEqual(1,len(hideShow.components))
+        # errors of the content factory are not lost
+        async def failingContent(_a):
+            raise Exception("content failed")
+        hideShow=HideShow(("Hide","Show"),content_factory=failingContent,a=parent)
+        with self.assertRaises(Exception):
+            asyncio.run(hideShow.load())
+        
+    def testCollapsibleLazyContent(self):
+        '''
+        test that the body of a Collapsible is only created when it is shown
+        '''
+        calls=[]
+        async def createBody(a):
+            calls.append(a)
+            jp.Span(a=a,text="lazy body")
+        # collapsed=False starts with a hidden body
+        collapsible=Collapsible("lazy",contentFactory=createBody,discardOnHide=True)
+        self.assertFalse(collapsible.isShown())
+        self.assertEqual([],calls)
+        asyncio.run(collapsible.onCollapseClick(None))
+        self.assertTrue(collapsible.isShown())
+        self.assertEqual([collapsible.body],calls)
+        self.assertEqual(1,len(collapsible.body.components))
+        asyncio.run(collapsible.onCollapseClick(None))
+        self.assertEqual([],collapsible.body.components)
+        # only the async created body is discarded
+        header=jp.Span(a=collapsible.body,text="header")
+        asyncio.run(collapsible.onCollapseClick(None))
+        self.assertEqual(2,len(collapsible.body.components))
+        asyncio.run(collapsible.onCollapseClick(None))
+        self.assertEqual([header],collapsible.body.components)
+        collapsible=Collapsible("eager",collapsed=True,contentFactory=createBody)
+        self.assertTrue(collapsible.isShown())
+        asyncio.run(collapsible.load())
+        self.assertEqual(1,len(collapsible.body.components))